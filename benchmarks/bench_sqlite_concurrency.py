@@ -0,0 +1,195 @@
+"""
+Чтение под одновременной записью на файловой SQLite.
+
+Для каждого движка базы поднимает отдельный процесс со свежей базой,
+запускает потоки-читатели (ленты, профиль, пост) и потоки-писатели
+(add_comment, post_create) и считает пропускную способность, p99 чтения
+и ошибки «database is locked»:
+
+    python benchmarks/bench_sqlite_concurrency.py --output sqlite.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINES = ('django.db.backends.sqlite3', 'core.db.backends.sqlite3')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--engine', help='Прогнать только этот движок.')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Куда записать JSON с итогами.')
+    return parser.parse_args()
+
+
+def run_engine(args):
+    sys.path.insert(0, os.path.join(BASE_DIR, 'yatube'))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    from django.conf import settings
+
+    workdir = tempfile.mkdtemp(prefix='yatube-sqlite-')
+    settings.DATABASES['default'].update({
+        'ENGINE': args.engine,
+        'TEST': {'NAME': os.path.join(workdir, 'bench.sqlite3')},
+    })
+    # Без кеша каждое чтение доходит до базы.
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+    }
+    settings.MEDIA_ROOT = workdir
+    settings.THUMBNAIL_WORKERS = 0
+
+    import django
+    django.setup()
+
+    from django.db import OperationalError, connection
+    from django.test import Client
+    from django.urls import reverse
+    from posts.counters import recount_all
+    from posts.models import Group, Post, User
+
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True
+    )
+    rng = random.Random(args.seed)
+    group = Group.objects.create(title='Группа', slug='bench', description='')
+    User.objects.bulk_create(
+        User(username=f'user{number}') for number in range(args.users)
+    )
+    users = list(User.objects.all())
+    Post.objects.bulk_create(
+        Post(author=rng.choice(users), group=group, text=f'Пост {number}')
+        for number in range(args.posts)
+    )
+    recount_all()
+    post_ids = list(Post.objects.values_list('pk', flat=True))
+    read_urls = [
+        reverse('posts:index'),
+        reverse('posts:group_list', args=[group.slug]),
+    ] + [
+        reverse('posts:profile', args=[user.username]) for user in users[:10]
+    ] + [
+        reverse('posts:post_detail', args=[pk]) for pk in post_ids[:10]
+    ]
+    connection.close()
+
+    stop = threading.Event()
+    reads, writes, errors = [], [], []
+    lock = threading.Lock()
+
+    def reader(number):
+        client = Client()
+        thread_rng = random.Random(number)
+        latencies = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                client.get(thread_rng.choice(read_urls))
+            except OperationalError as error:
+                with lock:
+                    errors.append(str(error))
+                continue
+            latencies.append(time.perf_counter() - started)
+        connection.close()
+        with lock:
+            reads.extend(latencies)
+
+    def writer(number):
+        client = Client()
+        client.force_login(users[number % len(users)])
+        thread_rng = random.Random(number)
+        done = 0
+        while not stop.is_set():
+            try:
+                if thread_rng.random() < 0.7:
+                    client.post(
+                        reverse(
+                            'posts:add_comment',
+                            args=[thread_rng.choice(post_ids)]
+                        ),
+                        {'text': 'Комментарий'}
+                    )
+                else:
+                    client.post(
+                        reverse('posts:post_create'), {'text': 'Новый пост'}
+                    )
+                done += 1
+            except OperationalError as error:
+                with lock:
+                    errors.append(str(error))
+        connection.close()
+        with lock:
+            writes.append(done)
+
+    threads = [
+        threading.Thread(target=reader, args=(number,))
+        for number in range(args.readers)
+    ] + [
+        threading.Thread(target=writer, args=(number,))
+        for number in range(args.writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+    reads.sort()
+    return {
+        'engine': args.engine,
+        'readers': args.readers,
+        'writers': args.writers,
+        'duration_s': args.duration,
+        'reads_per_s': round(len(reads) / args.duration, 2),
+        'writes_per_s': round(sum(writes) / args.duration, 2),
+        'read_p50_ms': round(statistics.median(reads) * 1000, 3)
+        if reads else None,
+        'read_p99_ms': round(
+            reads[min(int(len(reads) * 0.99), len(reads) - 1)] * 1000, 3
+        ) if reads else None,
+        'errors': len(errors),
+        'locked_errors': sum('locked' in error for error in errors),
+    }
+
+
+def main():
+    args = parse_args()
+    if args.engine:
+        print(json.dumps(run_engine(args)))
+        return
+    results = []
+    for engine in ENGINES:
+        command = [sys.executable, os.path.abspath(__file__), '--engine',
+                   engine]
+        for name in ('readers', 'writers', 'duration', 'users', 'posts',
+                     'seed'):
+            command += [f'--{name}', str(getattr(args, name))]
+        output = subprocess.check_output(command, text=True)
+        results.append(json.loads(output.strip().splitlines()[-1]))
+        print(f'{engine}: готово', file=sys.stderr)
+    output = json.dumps({'results': results}, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,422 @@
+"""
+Нагрузочный бенчмарк маршрутов posts/urls.py.
+
+Наполняет отдельную базу данными через mixer (как фикстуры в tests/),
+прогоняет каждый маршрут через тестовый клиент Django и через настоящий
+многопоточный WSGI-сервер и пишет пропускную способность и задержки
+p50/p99 в JSON, чтобы сравнивать коммиты между собой:
+
+    python benchmarks/bench_views.py --output before.json
+    python benchmarks/bench_views.py --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urlsplit
+from urllib.request import Request, urlopen
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+# Профиль dev, но без DEBUG: иначе в задержки входит запись каждого
+# SQL-запроса в connection.queries и результаты не сравнить с боевыми.
+os.environ.setdefault('YATUBE_ENV', 'dev')
+os.environ.setdefault('YATUBE_DEBUG', 'false')
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.urls import urlpatterns as api_urlpatterns  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.core.servers.basehttp import (  # noqa: E402
+    ThreadedWSGIServer, WSGIRequestHandler)
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.db.backends.signals import connection_created  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from mixer.backend.django import mixer  # noqa: E402
+from posts.models import Comment, Follow, Group, Post, User  # noqa: E402
+from posts.urls import urlpatterns  # noqa: E402
+
+Route = namedtuple('Route', 'name method path data auth safe')
+
+
+@transaction.atomic
+def seed(sizes, seed_value):
+    """Наполняет базу пользователями, группами, постами и подписками."""
+    mixer.faker.seed_instance(seed_value)
+    rng = random.Random(seed_value)
+    users = mixer.cycle(sizes['users']).blend(User)
+    bench_user = User.objects.create_user(username='bench')
+    groups = mixer.cycle(sizes['groups']).blend(Group)
+    posts = mixer.cycle(sizes['posts']).blend(
+        Post,
+        author=(rng.choice(users) for _ in range(sizes['posts'])),
+        group=(rng.choice(groups) for _ in range(sizes['posts'])),
+        image=''
+    )
+    mixer.cycle(sizes['comments']).blend(
+        Comment,
+        post=(rng.choice(posts) for _ in range(sizes['comments'])),
+        author=(rng.choice(users) for _ in range(sizes['comments']))
+    )
+    pairs = set()
+    while len(pairs) < min(sizes['follows'], len(users) * (len(users) - 1)):
+        user, author = rng.sample(users, 2)
+        pairs.add((user.pk, author.pk))
+    pairs.update(
+        (bench_user.pk, user.pk) for user in users[:len(users) // 2]
+    )
+    for user_id, author_id in pairs:
+        Follow.objects.create(user_id=user_id, author_id=author_id)
+    return bench_user
+
+
+@transaction.atomic
+def build_routes(bench_user, iterations):
+    """Запросы для каждого маршрута; пишущие маршруты небезопасны."""
+    post = Post.objects.order_by('-comments_count', 'pk').first()
+    group = Group.objects.first()
+    author = post.author
+    others = list(
+        User.objects.exclude(pk=bench_user.pk)
+        .exclude(following__user=bench_user)[:iterations]
+    )
+    edited = Post.objects.create(author=bench_user, text='Пост для правки')
+    Post.objects.bulk_create(
+        Post(author=bench_user, text=f'Пост для удаления {i}')
+        for i in range(iterations)
+    )
+    disposable = iter(
+        Post.objects.filter(author=bench_user).exclude(pk=edited.pk)
+    )
+    authors = iter(others * iterations)
+    unfollow = iter(others * iterations)
+    api_authors = iter(others * iterations)
+    return [
+        Route('index', 'GET', lambda: reverse('posts:index'), None,
+              False, True),
+        Route('index', 'GET', lambda: reverse('posts:index') + '?page=50',
+              None, False, True),
+        Route('group_list', 'GET',
+              lambda: reverse('posts:group_list', args=[group.slug]),
+              None, False, True),
+        Route('profile', 'GET',
+              lambda: reverse('posts:profile', args=[author.username]),
+              None, True, True),
+        Route('post_detail', 'GET',
+              lambda: reverse('posts:post_detail', args=[post.pk]),
+              None, True, True),
+        Route('post_comments', 'GET',
+              lambda: reverse('posts:post_comments', args=[post.pk]),
+              None, False, True),
+        Route('follow_index', 'GET', lambda: reverse('posts:follow_index'),
+              None, True, True),
+        Route('search', 'GET',
+              lambda: reverse('posts:search') + '?' + urlencode({'q': 'это'}),
+              None, False, True),
+        Route('data_export', 'GET', lambda: reverse('posts:data_export'),
+              None, True, True),
+        Route('post_create', 'GET', lambda: reverse('posts:post_create'),
+              None, True, True),
+        Route('post_create', 'POST', lambda: reverse('posts:post_create'),
+              {'text': 'Новый пост из бенчмарка'}, True, False),
+        Route('post_edit', 'POST',
+              lambda: reverse('posts:post_edit', args=[edited.pk]),
+              {'text': 'Отредактировано'}, True, False),
+        Route('add_comment', 'POST',
+              lambda: reverse('posts:add_comment', args=[post.pk]),
+              {'text': 'Комментарий из бенчмарка'}, True, False),
+        Route('post_delete', 'GET',
+              lambda: reverse('posts:post_delete',
+                              args=[next(disposable).pk]),
+              None, True, False),
+        Route('profile_follow', 'GET',
+              lambda: reverse('posts:profile_follow',
+                              args=[next(authors).username]),
+              None, True, False),
+        Route('profile_unfollow', 'GET',
+              lambda: reverse('posts:profile_unfollow',
+                              args=[next(unfollow).username]),
+              None, True, False),
+        Route('api_posts', 'GET', lambda: reverse('api:posts'), None,
+              False, True),
+        Route('api_post', 'GET', lambda: reverse('api:post', args=[post.pk]),
+              None, True, True),
+        Route('api_comments', 'GET',
+              lambda: reverse('api:comments', args=[post.pk]),
+              None, False, True),
+        Route('api_follow_feed', 'GET', lambda: reverse('api:follow_feed'),
+              None, True, True),
+        Route('api_groups', 'GET', lambda: reverse('api:groups'), None,
+              False, True),
+        Route('api_group_posts', 'GET',
+              lambda: reverse('api:group_posts', args=[group.slug]),
+              None, False, True),
+        Route('api_profile', 'GET',
+              lambda: reverse('api:profile', args=[author.username]),
+              None, True, True),
+        Route('api_profile_posts', 'GET',
+              lambda: reverse('api:profile_posts', args=[author.username]),
+              None, False, True),
+        Route('api_posts', 'POST', lambda: reverse('api:posts'),
+              {'text': 'Новый пост из бенчмарка'}, True, False),
+        Route('api_follow', 'POST',
+              lambda: reverse('api:follow', args=[next(api_authors).username]),
+              None, True, False),
+    ]
+
+
+def check_coverage(routes):
+    missing = {pattern.name for pattern in urlpatterns}.union(
+        f'api_{pattern.name}' for pattern in api_urlpatterns
+    ) - {route.name for route in routes}
+    if missing:
+        raise SystemExit(
+            f'Нет сценария бенчмарка для маршрутов: {", ".join(missing)}'
+        )
+
+
+def summarize(route, mode, path, latencies, elapsed, queries=None):
+    latencies = sorted(latencies)
+    result = {
+        'route': route.name,
+        'method': route.method,
+        'path': path,
+        'mode': mode,
+        'auth': route.auth,
+        'requests': len(latencies),
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 3),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 3),
+        'p99_ms': round(
+            latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+            * 1000, 3
+        ),
+    }
+    if queries:
+        result['queries_mean'] = round(statistics.mean(queries), 2)
+    return result
+
+
+def bench_client(route, client, iterations, warmup):
+    cache.clear()
+    send = client.post if route.method == 'POST' else client.get
+    for _ in range(warmup if route.safe else 0):
+        send(route.path(), route.data)
+    paths, latencies, queries = [], [], []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        paths.append(route.path())
+        request_started = time.perf_counter()
+        response = send(paths[-1], route.data)
+        if response.streaming:
+            # Выгрузка читает базу, пока отдаётся тело.
+            b''.join(response.streaming_content)
+        latencies.append(time.perf_counter() - request_started)
+        queries.append(response.metrics.queries)
+    elapsed = time.perf_counter() - started
+    return summarize(route, 'client', paths[0], latencies, elapsed, queries)
+
+
+def bench_wsgi(route, base_url, cookie, iterations, warmup, concurrency):
+    """Только безопасные GET: пишущие маршруты требуют CSRF-токена."""
+    cache.clear()
+    path = route.path()
+    url = base_url + path
+    headers = {'Cookie': cookie} if route.auth else {}
+
+    def fetch(_):
+        request_started = time.perf_counter()
+        try:
+            with urlopen(Request(url, headers=headers)) as response:
+                response.read()
+        except HTTPError as error:
+            error.read()
+        return time.perf_counter() - request_started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, range(warmup)))
+        started = time.perf_counter()
+        latencies = list(pool.map(fetch, range(iterations)))
+        elapsed = time.perf_counter() - started
+    return summarize(route, 'wsgi', path, latencies, elapsed)
+
+
+def add_latency(seconds):
+    """Имитирует сетевую задержку базы на каждом запросе."""
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(wrapper)
+
+    install(None, connection)
+    connection_created.connect(install, weak=False)
+
+
+def start_server():
+    server = ThreadedWSGIServer(('127.0.0.1', 0), WSGIRequestHandler)
+    server.set_app(get_wsgi_application())
+    WSGIRequestHandler.log_message = lambda *args: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _key(item):
+    return (
+        item['route'], item['method'], item['mode'],
+        urlsplit(item['path']).query
+    )
+
+
+def compare(previous, results):
+    index = {_key(item): item for item in previous['results']}
+    print(f'{"маршрут":<40}{"режим":<8}{"p50 было":>10}{"p50 стало":>11}'
+          f'{"p99 было":>10}{"p99 стало":>11}')
+    for item in results:
+        old = index.get(_key(item))
+        if old is None:
+            continue
+        print(f'{item["method"] + " " + item["path"]:<40}{item["mode"]:<8}'
+              f'{old["p50_ms"]:>10}{item["p50_ms"]:>11}'
+              f'{old["p99_ms"]:>10}{item["p99_ms"]:>11}')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--posts', type=int, default=3000)
+    parser.add_argument('--comments', type=int, default=5000)
+    parser.add_argument('--follows', type=int, default=2000)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument(
+        '--query-workers', type=int, default=settings.VIEW_QUERY_WORKERS,
+        help='VIEW_QUERY_WORKERS; 0 — запросы представления по очереди.'
+    )
+    parser.add_argument(
+        '--db-latency', type=float, default=0,
+        help='Задержка на каждый SQL-запрос в мс, как у базы по сети.'
+    )
+    parser.add_argument(
+        '--routes', help='Имена маршрутов через запятую; по умолчанию все.'
+    )
+    parser.add_argument('--db', help='Файл базы; по умолчанию временный.')
+    parser.add_argument('--output', help='Куда записать JSON с итогами.')
+    parser.add_argument('--compare', help='JSON прошлого прогона.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    sizes = {
+        name: getattr(args, name)
+        for name in ('users', 'groups', 'posts', 'comments', 'follows')
+    }
+    settings.VIEW_QUERY_WORKERS = args.query_workers
+    workdir = tempfile.mkdtemp(prefix='yatube-bench-')
+    settings.MEDIA_ROOT = workdir
+    settings.DATABASES['default']['TEST'] = {
+        'NAME': args.db or os.path.join(workdir, 'bench.sqlite3')
+    }
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=bool(args.db)
+    )
+    try:
+        bench_user = (
+            User.objects.filter(username='bench').first()
+            or seed(sizes, args.seed)
+        )
+        routes = build_routes(bench_user, args.iterations + args.warmup)
+        check_coverage(routes)
+        if args.routes:
+            names = args.routes.split(',')
+            routes = [route for route in routes if route.name in names]
+
+        anonymous, logged_in = Client(), Client()
+        logged_in.force_login(bench_user)
+        cookie = '; '.join(
+            f'{morsel.key}={morsel.value}'
+            for morsel in logged_in.cookies.values()
+        )
+        if args.db_latency:
+            add_latency(args.db_latency / 1000)
+        server = start_server()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+
+        results = []
+        for route in routes:
+            client = logged_in if route.auth else anonymous
+            results.append(
+                bench_client(route, client, args.iterations, args.warmup)
+            )
+            if route.safe and route.method == 'GET':
+                results.append(bench_wsgi(
+                    route, base_url, cookie, args.iterations, args.warmup,
+                    args.concurrency
+                ))
+            print(f'{route.method} {route.name}: готово', file=sys.stderr)
+        server.shutdown()
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=0, keepdb=bool(args.db)
+        )
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'profile': settings.PROFILE,
+            'debug': settings.DEBUG,
+            'database': settings.DATABASES['default']['ENGINE'],
+            'sizes': sizes,
+            'iterations': args.iterations,
+            'concurrency': args.concurrency,
+            'query_workers': args.query_workers,
+            'db_latency_ms': args.db_latency,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'results': results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output)
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            compare(json.load(file), results)
+
+
+if __name__ == '__main__':
+    main()
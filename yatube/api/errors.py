@@ -0,0 +1,8 @@
+class ApiError(Exception):
+    """Ошибка, которую api_view отдаёт клиенту как JSON с кодом status."""
+
+    def __init__(self, status, detail, **extra):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.extra = extra
@@ -0,0 +1,88 @@
+"""
+Сериализация через .values(): строки приходят из базы словарями, без
+экземпляров моделей, а связанные поля выбираются тем же запросом.
+
+Каждый набор полей — словарь «имя в ответе → выражение ORM». Клиент
+может запросить только часть полей: ?fields=id,text,author.
+"""
+from posts.models import Post
+
+from .errors import ApiError
+
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'image_width': 'image_width',
+    'image_height': 'image_height',
+    'image_blurhash': 'image_blurhash',
+    'comments_count': 'comments_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+GROUP_FIELDS = {
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+}
+PROFILE_FIELDS = {
+    'username': 'username',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'posts_count': 'profile__posts_count',
+    'followers_count': 'profile__followers_count',
+    'following_count': 'profile__following_count',
+}
+
+
+def prefixed(fields, prefix):
+    """Тот же набор полей, выбираемый через связь (например, post__)."""
+    return {name: prefix + lookup for name, lookup in fields.items()}
+
+
+def requested_fields(request, available):
+    """Поля из ?fields=, по умолчанию все; неизвестное поле — ошибка 400."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(available)
+    names = [name for name in raw.split(',') if name]
+    unknown = [name for name in names if name not in available]
+    if unknown or not names:
+        raise ApiError(400, f'Неизвестные поля: {", ".join(unknown)}')
+    return names
+
+
+def select(queryset, fields, available, extra=()):
+    """values() только с нужными колонками; extra нужны пагинатору."""
+    lookups = {available[name] for name in fields}
+    return queryset.values(*lookups.union(extra))
+
+
+def _image_url(name):
+    return Post.image.field.storage.url(name) if name else None
+
+
+CONVERTERS = {
+    'image': _image_url,
+}
+
+
+def serialize(rows, fields, available):
+    converters = [
+        (name, available[name], CONVERTERS.get(name)) for name in fields
+    ]
+    return [
+        {
+            name: convert(row[lookup]) if convert else row[lookup]
+            for name, lookup, convert in converters
+        }
+        for row in rows
+    ]
@@ -0,0 +1,166 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.testing import QueryBudgetMixin
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(MAX_POSTS=3)
+class ApiTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовое название',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for i in range(5):
+            cls.post = Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {i}'
+            )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def send(self, client, method, url, data):
+        return getattr(client, method)(
+            url, json.dumps(data), content_type='application/json'
+        )
+
+    def test_feed_pages_follow_cursor(self):
+        """Лента отдаётся страницами, next ведёт на следующую."""
+        response = self.client.get(reverse('api:posts'))
+        data = response.json()
+        self.assertEqual(
+            [post['text'] for post in data['results']],
+            ['Пост 4', 'Пост 3', 'Пост 2']
+        )
+        self.assertEqual(data['results'][0]['author'], 'author')
+        self.assertEqual(data['results'][0]['group'], 'test-slug')
+        self.assertIsNone(data['previous'])
+        data = self.client.get(data['next']).json()
+        self.assertEqual(
+            [post['text'] for post in data['results']], ['Пост 1', 'Пост 0']
+        )
+        self.assertIsNone(data['next'])
+
+    def test_sparse_fieldsets(self):
+        """?fields= ограничивает поля ответа и сохраняется в ссылках."""
+        url = reverse('api:group_posts', args=[self.group.slug])
+        data = self.client.get(url + '?fields=id,text').json()
+        self.assertEqual(set(data['results'][0]), {'id', 'text'})
+        self.assertIn('fields=id%2Ctext', data['next'])
+        response = self.client.get(url + '?fields=id,password')
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_etag_returns_not_modified(self):
+        """Повторный запрос с If-None-Match получает 304 без тела."""
+        url = reverse('api:post', args=[self.post.id])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_create_edit_delete_post(self):
+        url = reverse('api:posts')
+        response = self.send(self.client, 'post', url, {'text': 'Новый'})
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        response = self.send(
+            self.author_client, 'post', url,
+            {'text': 'Новый', 'group': 'test-slug'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        created = response.json()
+        self.assertEqual(created['group'], 'test-slug')
+        post_url = reverse('api:post', args=[created['id']])
+        response = self.send(
+            self.reader_client, 'patch', post_url, {'text': 'Чужой'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        response = self.send(
+            self.author_client, 'patch', post_url, {'text': 'Правка'}
+        )
+        self.assertEqual(response.json()['text'], 'Правка')
+        self.assertEqual(response.json()['group'], 'test-slug')
+        response = self.author_client.delete(post_url)
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        self.assertFalse(Post.objects.filter(id=created['id']).exists())
+
+    def test_invalid_post_returns_errors(self):
+        response = self.send(
+            self.author_client, 'post', reverse('api:posts'), {'text': ''}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('text', response.json()['errors'])
+
+    def test_comments(self):
+        url = reverse('api:comments', args=[self.post.id])
+        response = self.send(
+            self.reader_client, 'post', url, {'text': 'Ещё один'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertEqual(response.json()['author'], 'reader')
+        data = self.client.get(url).json()
+        self.assertEqual(
+            [comment['text'] for comment in data['results']],
+            ['Комментарий', 'Ещё один']
+        )
+        response = self.client.get(reverse('api:comments', args=[0]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(response.json()['detail'], 'Не найдено')
+
+    def test_follow_and_follow_feed(self):
+        url = reverse('api:follow', args=[self.author.username])
+        response = self.reader_client.post(url)
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=self.author)
+            .exists()
+        )
+        profile = self.reader_client.get(
+            reverse('api:profile', args=[self.author.username])
+        ).json()
+        self.assertTrue(profile['following'])
+        self.assertEqual(profile['posts_count'], 5)
+        feed = self.reader_client.get(reverse('api:follow_feed')).json()
+        self.assertEqual(feed['results'][0]['id'], self.post.id)
+        response = self.reader_client.delete(url)
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_wrong_method(self):
+        response = self.client.delete(reverse('api:groups'))
+        self.assertEqual(response.status_code, HTTPStatus.METHOD_NOT_ALLOWED)
+        self.assertEqual(response['Allow'], 'GET')
+
+    def test_read_endpoints_stay_within_query_budget(self):
+        urls = (
+            reverse('api:posts'),
+            reverse('api:post', args=[self.post.id]),
+            reverse('api:comments', args=[self.post.id]),
+            reverse('api:groups'),
+            reverse('api:group_posts', args=[self.group.slug]),
+            reverse('api:profile', args=[self.author.username]),
+            reverse('api:profile_posts', args=[self.author.username]),
+            reverse('api:follow_feed'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertWithinQueryBudget(self.reader_client.get(url))
@@ -0,0 +1,302 @@
+import hashlib
+import json
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+
+from core.concurrent import gather
+from core.db.routers import replica_reads
+from core.metrics import query_budget, unbudgeted_queries
+from posts.forms import CommentForm
+from posts.models import Comment, Follow, Group, Post, TimelineEntry, User
+from posts.pagination import CursorPaginator
+from posts.timeline import pull_celebrity_posts
+
+from .errors import ApiError
+from .forms import ApiPostForm
+from .serializers import (COMMENT_FIELDS, GROUP_FIELDS, POST_FIELDS,
+                          PROFILE_FIELDS, prefixed, requested_fields, select,
+                          serialize)
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def api_view(*methods, login=()):
+    """
+    Разрешённые методы и методы, требующие входа.
+
+    Ошибки (404, 403, ApiError) отдаются клиенту JSON, а не HTML-страницей.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise ApiError(405, 'Метод не поддерживается')
+                if (
+                    request.method in login
+                    and not request.user.is_authenticated
+                ):
+                    raise ApiError(401, 'Нужно войти')
+                return view(request, *args, **kwargs)
+            except Http404:
+                return error_response(ApiError(404, 'Не найдено'))
+            except PermissionDenied:
+                return error_response(ApiError(403, 'Недостаточно прав'))
+            except ApiError as api_error:
+                response = error_response(api_error)
+                if api_error.status == 405:
+                    response['Allow'] = ', '.join(methods)
+                return response
+        return wrapper
+    return decorator
+
+
+def error_response(api_error):
+    return JsonResponse(
+        {'detail': api_error.detail, **api_error.extra},
+        status=api_error.status
+    )
+
+
+def json_response(request, data, status=200):
+    """
+    JSON с ETag по содержимому: повторный запрос получает 304 без тела.
+    """
+    body = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    if request.method in SAFE_METHODS and status == 200:
+        etag = '"{}"'.format(hashlib.md5(body.encode()).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        return response
+    return HttpResponse(body, content_type='application/json', status=status)
+
+
+def payload(request):
+    """Тело запроса: JSON или обычная форма с файлами."""
+    if request.content_type != 'application/json':
+        return request.POST, request.FILES
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        raise ApiError(400, 'Тело запроса — не JSON')
+    if not isinstance(data, dict):
+        raise ApiError(400, 'Ожидается JSON-объект')
+    return data, None
+
+
+def validation_error(form):
+    return ApiError(400, 'Ошибка в данных', errors=form.errors)
+
+
+def cursor_page(request, rows, fields, available, per_page,
+                date_field='pub_date', descending=True):
+    """Страница ответа со ссылками next/previous на соседние курсоры."""
+    paginator = CursorPaginator(
+        rows, per_page, date_field=date_field, descending=descending
+    )
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+
+    def link(cursor):
+        if cursor is None:
+            return None
+        query = request.GET.copy()
+        query['cursor'] = cursor
+        return f'{request.path}?{urlencode(query)}'
+
+    return {
+        'results': serialize(page_obj.object_list, fields, available),
+        'next': link(paginator.next_cursor),
+        'previous': link(paginator.previous_cursor),
+    }
+
+
+def post_feed(request, queryset):
+    fields = requested_fields(request, POST_FIELDS)
+    rows = select(queryset, fields, POST_FIELDS, extra=('id', 'pub_date'))
+    return cursor_page(request, rows, fields, POST_FIELDS, settings.MAX_POSTS)
+
+
+def post_data(post_id, request):
+    fields = requested_fields(request, POST_FIELDS)
+    rows = select(
+        Post.objects.filter(id=post_id), fields, POST_FIELDS
+    )
+    return serialize([get_object_or_404(rows)], fields, POST_FIELDS)[0]
+
+
+@replica_reads
+@query_budget(3)
+@api_view('GET', 'POST', login=('POST',))
+def posts(request):
+    if request.method == 'GET':
+        return json_response(request, post_feed(request, Post.objects.all()))
+    data, files = payload(request)
+    form = ApiPostForm(data, files=files)
+    if not form.is_valid():
+        raise validation_error(form)
+    post = form.save(commit=False)
+    post.author = request.user
+    post.save()
+    form.save_m2m()
+    return json_response(request, post_data(post.id, request), status=201)
+
+
+@replica_reads
+@query_budget(4)
+@api_view('GET', 'PATCH', 'DELETE', login=('PATCH', 'DELETE'))
+def post_detail(request, post_id):
+    if request.method == 'GET':
+        return json_response(request, post_data(post_id, request))
+    post = get_object_or_404(Post.objects.select_related('group'), id=post_id)
+    if post.author_id != request.user.id:
+        raise PermissionDenied
+    if request.method == 'DELETE':
+        post.delete()
+        return HttpResponse(status=204)
+    data, _ = payload(request)
+    current = {'text': post.text, 'group': post.group and post.group.slug}
+    form = ApiPostForm({**current, **data}, instance=post)
+    if not form.is_valid():
+        raise validation_error(form)
+    form.save()
+    return json_response(request, post_data(post.id, request))
+
+
+@replica_reads
+@query_budget(4)
+@api_view('GET', 'POST', login=('POST',))
+def comments(request, post_id):
+    if request.method == 'POST':
+        post = get_object_or_404(Post, id=post_id)
+        data, _ = payload(request)
+        form = CommentForm(data)
+        if not form.is_valid():
+            raise validation_error(form)
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post = post
+        comment.save()
+        fields = requested_fields(request, COMMENT_FIELDS)
+        rows = select(
+            Comment.objects.filter(id=comment.id), fields, COMMENT_FIELDS
+        )
+        return json_response(
+            request, serialize(rows, fields, COMMENT_FIELDS)[0], status=201
+        )
+    fields = requested_fields(request, COMMENT_FIELDS)
+    rows = select(
+        Comment.objects.filter(post_id=post_id).order_by('created', 'id'),
+        fields,
+        COMMENT_FIELDS,
+        extra=('id', 'created')
+    )
+    exists, page = gather(
+        lambda: Post.objects.filter(id=post_id).exists(),
+        lambda: cursor_page(
+            request, rows, fields, COMMENT_FIELDS, settings.MAX_COMMENTS,
+            date_field='created', descending=False
+        )
+    )
+    if not exists:
+        raise Http404
+    return json_response(request, page)
+
+
+@replica_reads
+@query_budget(3)
+@api_view('GET')
+def groups(request):
+    fields = requested_fields(request, GROUP_FIELDS)
+    rows = select(Group.objects.order_by('title'), fields, GROUP_FIELDS)
+    return json_response(
+        request, {'results': serialize(rows, fields, GROUP_FIELDS)}
+    )
+
+
+@replica_reads
+@query_budget(4)
+@api_view('GET')
+def group_posts(request, slug):
+    exists, page = gather(
+        lambda: Group.objects.filter(slug=slug).exists(),
+        lambda: post_feed(request, Post.objects.filter(group__slug=slug))
+    )
+    if not exists:
+        raise Http404
+    return json_response(request, page)
+
+
+@replica_reads
+@query_budget(4)
+@api_view('GET')
+def profile(request, username):
+    fields = requested_fields(request, PROFILE_FIELDS)
+    rows = select(
+        User.objects.filter(username=username), fields, PROFILE_FIELDS
+    )
+    user_id = request.user.id
+    data, following = gather(
+        lambda: serialize(
+            [get_object_or_404(rows)], fields, PROFILE_FIELDS
+        )[0],
+        lambda: Follow.objects.filter(
+            author__username=username, user_id=user_id
+        ).exists()
+    )
+    data['following'] = following
+    return json_response(request, data)
+
+
+@replica_reads
+@query_budget(4)
+@api_view('GET')
+def profile_posts(request, username):
+    exists, page = gather(
+        lambda: User.objects.filter(username=username).exists(),
+        lambda: post_feed(
+            request, Post.objects.filter(author__username=username)
+        )
+    )
+    if not exists:
+        raise Http404
+    return json_response(request, page)
+
+
+@replica_reads
+@query_budget(4)
+@api_view('GET', login=('GET',))
+def follow_feed(request):
+    entries = TimelineEntry.objects.filter(user=request.user)
+    with unbudgeted_queries():
+        pulled = pull_celebrity_posts(request.user)
+    if pulled:
+        entries = entries.using(DEFAULT_DB_ALIAS)
+    available = prefixed(POST_FIELDS, 'post__')
+    fields = requested_fields(request, available)
+    rows = select(entries, fields, available, extra=('id', 'pub_date'))
+    return json_response(
+        request,
+        cursor_page(request, rows, fields, available, settings.MAX_POSTS)
+    )
+
+
+@api_view('POST', 'DELETE', login=('POST', 'DELETE'))
+def follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if request.method == 'POST':
+        if author == request.user:
+            raise ApiError(400, 'Нельзя подписаться на себя')
+        Follow.objects.get_or_create(user=request.user, author=author)
+        return json_response(request, {'following': True}, status=201)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return HttpResponse(status=204)
@@ -0,0 +1,141 @@
+"""
+Сжатие ответов: выбор кодировки по Accept-Encoding, gzip и brotli.
+
+brotli — необязательный пакет `Brotli`: без него выбирается gzip.
+Статика сжимается заранее и по максимуму (compress), ответы
+представлений — на лету с уровнем, который дешевле по процессору
+(Compressor).
+"""
+import gzip
+import zlib
+from io import BytesIO
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# В порядке предпочтения сервера.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+
+# Уже сжатые форматы: повторное сжатие только тратит процессор.
+COMPRESSED_TYPES = ('image/', 'video/', 'audio/', 'font/woff')
+# Текстовые форматы среди них.
+TEXT_TYPES = ('image/svg+xml',)
+
+# Уровни сжатия на лету: почти тот же размер, что у максимальных,
+# в разы быстрее.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def compressible(content_type):
+    content_type = content_type.split(';')[0].strip().lower()
+    if content_type in TEXT_TYPES:
+        return True
+    return not content_type.startswith(COMPRESSED_TYPES)
+
+
+def _qualities(header):
+    """Кодировки из Accept-Encoding с их q; без q — 1."""
+    qualities = {}
+    for item in (header or '').split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        params = params.strip().replace(' ', '')
+        quality = 1.0
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        if coding:
+            qualities[coding] = quality
+    return qualities
+
+
+def accepted(header):
+    """Кодировки из Accept-Encoding с ненулевым q."""
+    return {
+        coding
+        for coding, quality in _qualities(header).items() if quality > 0
+    }
+
+
+def negotiate(header, available=ENCODINGS):
+    """
+    Лучшая из доступных кодировок, которую принимает клиент, или None.
+
+    Явно указанный q кодировки важнее *: "br;q=0, *" исключает br.
+    """
+    qualities = _qualities(header)
+    for encoding in available:
+        if qualities.get(encoding, qualities.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data)
+    # mtime=0: одинаковое содержимое даёт одинаковые байты. GzipFile, а не
+    # gzip.compress: у того аргумент mtime появился только в Python 3.8.
+    buffer = BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as file:
+        file.write(data)
+    return buffer.getvalue()
+
+
+class Compressor:
+    """
+    Потоковое сжатие ответа.
+
+    compress() по умолчанию сбрасывает буфер сжатия, чтобы кусок
+    потокового ответа сразу ушёл клиенту, а не ждал следующих.
+    """
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            # wbits 31: поток в формате gzip, с заголовком и CRC.
+            self._compressor = zlib.compressobj(
+                GZIP_LEVEL, zlib.DEFLATED, 31
+            )
+
+    def compress(self, data, flush=True):
+        if self.encoding == 'br':
+            data = self._compressor.process(data)
+            return data + self._compressor.flush() if flush else data
+        data = self._compressor.compress(data)
+        if flush:
+            data += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+def compress_stream(chunks, encoding):
+    compressor = Compressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def cache_compressed(response, timeout):
+    """
+    Разрешает кешировать сжатые копии ответа на timeout секунд.
+
+    Копии лежат под хешем содержимого, поэтому страница из кеша
+    представления сжимается один раз на запись кеша, а не на запрос.
+    Только для ответов без персональных данных.
+    """
+    response.compressed_cache_timeout = timeout
+    return response
@@ -0,0 +1,85 @@
+import threading
+
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+
+_write_locks = {}
+_write_locks_guard = threading.Lock()
+
+
+def write_lock(name):
+    """Общая для всех потоков процесса блокировка записи в файл базы."""
+    with _write_locks_guard:
+        return _write_locks.setdefault(name, threading.Lock())
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite для небольших узлов: WAL, synchronous=NORMAL, mmap и ожидание
+    занятой базы вместо мгновенного «database is locked».
+
+    Транзакции начинаются с BEGIN IMMEDIATE: отложенная транзакция,
+    которая сначала читает, а потом пишет, не может дождаться писателя
+    и сразу падает с SQLITE_BUSY. Пишущие транзакции одного процесса
+    дополнительно выстраиваются в очередь на блокировке, а не крутятся
+    в busy_timeout. В OPTIONS можно переопределить 'pragmas' и выключить
+    очередь через 'serialize_writes': False.
+    """
+    holds_write_lock = False
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**PRAGMAS, **params.pop('pragmas', {})}
+        self.serialize_writes = params.pop('serialize_writes', True)
+        self.write_lock = write_lock(self.settings_dict['NAME'])
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.serialize_writes:
+            # Тайм-аут не даёт двум соединениям одного потока к одному
+            # файлу заблокировать друг друга: дальше ждёт уже SQLite.
+            self.holds_write_lock = self.write_lock.acquire(
+                timeout=self.pragmas['busy_timeout'] / 1000
+            )
+        try:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        except BaseException:
+            # Транзакция не началась: commit/rollback не вызовут, и без
+            # освобождения здесь блокировку больше никто не получит.
+            self._release_write_lock()
+            raise
+
+    def _release_write_lock(self):
+        if self.holds_write_lock:
+            self.holds_write_lock = False
+            self.write_lock.release()
+
+    def _commit(self):
+        try:
+            super()._commit()
+        finally:
+            self._release_write_lock()
+
+    def _rollback(self):
+        try:
+            super()._rollback()
+        finally:
+            self._release_write_lock()
+
+    def _close(self):
+        try:
+            super()._close()
+        finally:
+            self._release_write_lock()
@@ -0,0 +1,58 @@
+"""
+Чтение с реплик для представлений, которые только читают.
+
+Представление с replica_reads читает с одной из DATABASE_REPLICAS,
+всё остальное (и любые записи) идёт в default. После записи
+ReplicaMiddleware ставит пользователю cookie, и пока она жива, его
+чтения тоже идут в default: свой новый пост он видит сразу, не дожидаясь
+репликации.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'pin_primary'
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_reads(view):
+    """Разрешает представлению читать с реплики."""
+    view.replica_reads = True
+    return view
+
+
+def pins_primary(view):
+    """Отмечает представление, которое пишет даже на GET."""
+    view.pins_primary = True
+    return view
+
+
+def activate(alias):
+    return _read_alias.set(alias)
+
+
+def deactivate(token):
+    _read_alias.reset(token)
+
+
+def choose_replica():
+    replicas = settings.DATABASE_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии default, объекты с них связываются свободно.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
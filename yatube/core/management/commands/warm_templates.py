@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.template_backends import warm_templates
+
+SLOWEST = 5
+
+
+class Command(BaseCommand):
+    help = 'Компилирует все шаблоны и показывает время разбора.'
+
+    def handle(self, *args, **options):
+        results = warm_templates()
+        total = sum(seconds for _, seconds, _ in results)
+        self.stdout.write(
+            f'Шаблонов: {len(results)}, разбор: {total * 1000:.1f} мс'
+        )
+        for name, seconds, _ in sorted(
+            results, key=lambda result: result[1], reverse=True
+        )[:SLOWEST]:
+            self.stdout.write(f'  {name}: {seconds * 1000:.2f} мс')
+        errors = [(name, error) for name, _, error in results if error]
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        if errors:
+            raise CommandError(f'Шаблонов с ошибками: {len(errors)}')
+        self.stdout.write(self.style.SUCCESS('Шаблоны скомпилированы'))
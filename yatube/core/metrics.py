@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+QUANTILES = (0.5, 0.99)
+SUMMARIES = (
+    ('yatube_request_duration_seconds', 'Время ответа.', 'duration'),
+    ('yatube_db_queries', 'Число SQL-запросов.', 'queries'),
+    ('yatube_db_duration_seconds', 'Время в базе.', 'db_time'),
+    (
+        'yatube_template_duration_seconds',
+        'Время рендеринга шаблонов.',
+        'template_time'
+    ),
+)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Показатели одного запроса: SQL, шаблоны и общее время."""
+
+    def __init__(self):
+        self.view = None
+        self.status = None
+        self.budget = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.duration = 0.0
+        # Запросы могут идти из пула core.concurrent.
+        self._lock = threading.Lock()
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.queries > self.budget
+
+    def wrap_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.queries += 1
+                self.db_time += elapsed
+
+
+class MetricsBuffer:
+    """
+    Кольцевой буфер последних запросов, общий для потоков процесса.
+
+    Кроме буфера копит итоги по представлениям с запуска процесса: они
+    только растут, как и положено счётчикам Prometheus, а записи буфера
+    вытесняются.
+    """
+
+    def __init__(self, size):
+        self._records = deque(maxlen=size)
+        self._totals = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, metrics):
+        with self._lock:
+            self._records.append(metrics)
+            totals = self._totals.setdefault(metrics.view, {
+                'count': 0,
+                'over_budget': 0,
+                **{attr: 0 for _, _, attr in SUMMARIES},
+            })
+            totals['count'] += 1
+            totals['over_budget'] += metrics.over_budget
+            for _, _, attr in SUMMARIES:
+                totals[attr] += getattr(metrics, attr)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._records)
+
+    def totals(self):
+        with self._lock:
+            return OrderedDict(
+                (view, dict(totals)) for view, totals in self._totals.items()
+            )
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+
+
+buffer = MetricsBuffer(settings.METRICS_BUFFER_SIZE)
+
+
+def current():
+    """Показатели текущего запроса или None вне MetricsMiddleware."""
+    return _current.get()
+
+
+def activate(metrics):
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextmanager
+def unbudgeted_queries():
+    """
+    Не засчитывает в бюджет представления запросы внутри блока.
+
+    Для работы, число запросов которой зависит от данных, а не от
+    представления: например, по одному на автора.
+    """
+    metrics = current()
+    if metrics is None or metrics.budget is None:
+        yield
+        return
+    before = metrics.queries
+    try:
+        yield
+    finally:
+        with metrics._lock:
+            metrics.budget += metrics.queries - before
+
+
+def add_template_time(seconds):
+    metrics = current()
+    if metrics is not None:
+        metrics.template_time += seconds
+
+
+def query_budget(limit):
+    """Объявляет допустимое число SQL-запросов на GET к представлению."""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def _quantile(values, quantile):
+    index = min(int(quantile * len(values)), len(values) - 1)
+    return values[index]
+
+
+def _summary(lines, name, help_text, samples, totals, attr):
+    """
+    Квантили — по окну кольцевого буфера, _sum и _count — итоги
+    с запуска процесса.
+    """
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} summary')
+    for view, view_totals in totals.items():
+        values = sorted(samples.get(view, ()))
+        for quantile in QUANTILES if values else ():
+            lines.append(
+                f'{name}{{view="{view}",quantile="{quantile}"}} '
+                f'{_quantile(values, quantile):.6g}'
+            )
+        lines.append(
+            f'{name}_sum{{view="{view}"}} {view_totals[attr]:.6g}'
+        )
+        lines.append(
+            f'{name}_count{{view="{view}"}} {view_totals["count"]}'
+        )
+
+
+def render_prometheus(records, totals):
+    """Текстовый формат Prometheus по буферу и итогам MetricsBuffer."""
+    by_view = OrderedDict()
+    for record in records:
+        by_view.setdefault(record.view, []).append(record)
+    lines = []
+    for name, help_text, attr in SUMMARIES:
+        _summary(lines, name, help_text, {
+            view: [getattr(record, attr) for record in view_records]
+            for view, view_records in by_view.items()
+        }, totals, attr)
+    lines.append(
+        '# HELP yatube_query_budget_exceeded_total '
+        'Запросы сверх объявленного бюджета.'
+    )
+    lines.append('# TYPE yatube_query_budget_exceeded_total counter')
+    for view, view_totals in totals.items():
+        lines.append(
+            f'yatube_query_budget_exceeded_total{{view="{view}"}} '
+            f'{view_totals["over_budget"]}'
+        )
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+from .compression import (Compressor, compress_stream, compressible,
+                          negotiate)
+from .db import routers
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    Считает SQL-запросы, время в базе, в шаблонах и общее время ответа.
+
+    Записи копятся в кольцевом буфере core.metrics.buffer, а превышение
+    бюджета, объявленного через query_budget, пишется в лог.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.activate(request_metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(request_metrics.wrap_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+        request_metrics.duration = time.perf_counter() - started
+        match = request.resolver_match
+        request_metrics.view = match.view_name if match else 'unresolved'
+        request_metrics.status = response.status_code
+        metrics.buffer.add(request_metrics)
+        response.metrics = request_metrics
+        if request_metrics.over_budget:
+            logger.warning(
+                'Представление %s выполнило %d SQL-запросов при бюджете %d',
+                request_metrics.view,
+                request_metrics.queries,
+                request_metrics.budget
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request_metrics = metrics.current()
+        # Бюджет — про чтение: записи того же представления (API) его
+        # не расходуют.
+        if request_metrics is not None and request.method in ('GET', 'HEAD'):
+            request_metrics.budget = getattr(view_func, 'query_budget', None)
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответ в brotli или gzip — что лучше из принятого клиентом.
+
+    Уже сжатые форматы (картинки, видео, woff) не трогает, потоковые
+    ответы сжимает по кускам. Сжатые копии ответов, помеченных
+    core.compression.cache_compressed, берутся из кеша.
+    """
+    MIN_LENGTH = 200
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.has_header('Content-Encoding')
+            or 'no-transform' in response.get('Cache-Control', '')
+            or not compressible(response.get('Content-Type', ''))
+            or not response.streaming and len(response.content) < (
+                self.MIN_LENGTH
+            )
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            del response['Content-Length']
+        else:
+            content = self.compress(response, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+        # Сжатое тело — другие байты: сильный ETag становится слабым,
+        # условные запросы по нему продолжают работать.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def compress(response, encoding):
+        timeout = getattr(response, 'compressed_cache_timeout', None)
+        if timeout is None:
+            return _compress(response.content, encoding)
+        digest = hashlib.md5(response.content).hexdigest()
+        key = f'compressed:{encoding}:{digest}'
+        content = cache.get(key)
+        if content is None:
+            content = _compress(response.content, encoding)
+            cache.set(key, content, timeout)
+        return content
+
+
+def _compress(data, encoding):
+    compressor = Compressor(encoding)
+    return compressor.compress(data, flush=False) + compressor.finish()
+
+
+class ReplicaMiddleware:
+    """
+    Выбирает базу для чтения и закрепляет пишущего пользователя за default.
+
+    Небезопасный метод или представление с pins_primary ставят cookie на
+    REPLICA_PIN_SECONDS — этого хватает, чтобы реплика догнала запись.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = routers.activate(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.deactivate(token)
+        if getattr(request, 'pins_primary', False):
+            response.set_cookie(
+                routers.PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.pins_primary = (
+            request.method not in self.SAFE_METHODS
+            or getattr(view_func, 'pins_primary', False)
+        )
+        if (
+            getattr(view_func, 'replica_reads', False)
+            and not request.pins_primary
+            and routers.PIN_COOKIE not in request.COOKIES
+        ):
+            routers.activate(routers.choose_replica())
@@ -0,0 +1,113 @@
+"""
+WSGI-обёртка, отдающая собранную статику (STATIC_ROOT) мимо Django.
+
+Список файлов и их заголовки читаются один раз при старте: после
+collectstatic статика не меняется. Имена с хешем из манифеста
+отдаются с Cache-Control immutable на год, и повторный заход на
+страницу не скачивает статику вовсе; остальные — с коротким max-age
+и ETag. Сжатые копии .br и .gz (core.staticfiles) выбираются по
+Accept-Encoding.
+"""
+import json
+import mimetypes
+import os
+from wsgiref.util import FileWrapper
+
+from .compression import ENCODINGS, EXTENSIONS, negotiate
+
+MANIFEST_NAME = 'staticfiles.json'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=60'
+CHUNK_SIZE = 64 * 1024
+
+
+class StaticFile:
+    """Файл статики и его сжатые копии: кодировка -> (путь, размер, ETag)."""
+
+    def __init__(self, path, immutable):
+        content_type, _ = mimetypes.guess_type(path)
+        self.content_type = content_type or 'application/octet-stream'
+        if self.content_type.startswith('text/'):
+            self.content_type += '; charset=utf-8'
+        self.cache_control = IMMUTABLE if immutable else REVALIDATE
+        self.variants = {None: self._variant(path)}
+        for encoding in ENCODINGS:
+            if os.path.isfile(path + EXTENSIONS[encoding]):
+                self.variants[encoding] = self._variant(
+                    path + EXTENSIONS[encoding]
+                )
+        self.encodings = tuple(
+            encoding for encoding in ENCODINGS if encoding in self.variants
+        )
+
+    @staticmethod
+    def _variant(path):
+        stat = os.stat(path)
+        return path, stat.st_size, f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def scan(root):
+    """Файлы STATIC_ROOT по URL-пути относительно STATIC_URL."""
+    hashed = set()
+    manifest = os.path.join(root, MANIFEST_NAME)
+    if os.path.isfile(manifest):
+        with open(manifest, encoding='utf-8') as file:
+            hashed = set(json.load(file).get('paths', {}).values())
+    compressed = tuple(EXTENSIONS.values())
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            url = os.path.relpath(path, root).replace(os.sep, '/')
+            if url == MANIFEST_NAME or name.endswith(compressed):
+                continue
+            files[url] = StaticFile(path, url in hashed)
+    return files
+
+
+class StaticFilesApplication:
+
+    def __init__(self, application, root, prefix):
+        self.application = application
+        self.prefix = prefix
+        self.files = scan(root) if os.path.isdir(root) else {}
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        static = path.startswith(self.prefix) and self.files.get(
+            path[len(self.prefix):]
+        )
+        if not static:
+            return self.application(environ, start_response)
+        method = environ['REQUEST_METHOD']
+        if method not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed', [
+                ('Allow', 'GET, HEAD'), ('Content-Length', '0')
+            ])
+            return []
+        encoding = negotiate(
+            environ.get('HTTP_ACCEPT_ENCODING'), static.encodings
+        )
+        file_path, size, etag = static.variants[encoding]
+        headers = [
+            ('Content-Type', static.content_type),
+            ('Cache-Control', static.cache_control),
+            ('ETag', etag),
+        ]
+        if static.encodings:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        if etag in _etags(environ.get('HTTP_IF_NONE_MATCH')):
+            start_response('304 Not Modified', headers)
+            return []
+        headers.append(('Content-Length', str(size)))
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            return []
+        wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return wrapper(open(file_path, 'rb'), CHUNK_SIZE)
+
+
+def _etags(header):
+    return {etag.strip() for etag in (header or '').split(',')}
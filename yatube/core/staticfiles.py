@@ -0,0 +1,41 @@
+"""
+Хранилище статики для collectstatic: имена с хешем содержимого
+(ManifestStaticFilesStorage) и рядом заранее сжатые копии .gz и .br,
+которые отдаёт core.static.StaticFilesApplication.
+"""
+import mimetypes
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import ENCODINGS, EXTENSIONS, compress, compressible
+
+# Сжатая копия не нужна, если она почти не меньше оригинала.
+MIN_RATIO = 0.95
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for original, processed, done in super().post_process(
+            paths, dry_run, **options
+        ):
+            names.update((original, processed) if processed else ())
+            yield original, processed, done
+        if dry_run:
+            return
+        for name in sorted(names):
+            content_type, _ = mimetypes.guess_type(name)
+            if content_type is None or not compressible(content_type):
+                continue
+            with self.open(name) as file:
+                data = file.read()
+            for encoding in ENCODINGS:
+                compressed = compress(data, encoding)
+                if len(compressed) >= len(data) * MIN_RATIO:
+                    continue
+                compressed_name = name + EXTENSIONS[encoding]
+                self.delete(compressed_name)
+                self._save(compressed_name, ContentFile(compressed))
+                yield name, compressed_name, True
@@ -0,0 +1,95 @@
+"""
+Файловое хранилище с адресацией по содержимому.
+
+Файл ложится в <каталог upload_to>/ab/cd/<sha256>.<расширение>: имя
+от пользователя не участвует, одинаковые загрузки занимают один файл,
+а превью sorl, которые привязаны к имени исходника, общие для всех
+ссылок на него. Хеш считается при записи загрузки во временный файл,
+без отдельного чтения. Удалять такой файл можно только когда на него
+не осталось ссылок: за этим следит вызывающий код (posts.images.release).
+Запись дедуплицируется без блокировок, поэтому удаление идёт в два шага:
+файл сначала уводится под временное имя (detach), и если на него успела
+сослаться новая загрузка, возвращается на место (attach).
+"""
+import hashlib
+import os
+import tempfile
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Уровни подкаталогов по два символа хеша: 65536 каталогов на нижнем
+# уровне держат число файлов в каждом небольшим.
+SHARD_LEVELS = 2
+
+
+def content_name(directory, digest, extension):
+    shards = [digest[i * 2:i * 2 + 2] for i in range(SHARD_LEVELS)]
+    return '/'.join(
+        filter(None, (directory, *shards, digest + extension.lower()))
+    )
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # Итоговое имя выбирает _save по хешу; одинаковое содержимое
+        # должно получить то же имя, а не суффикс.
+        return name
+
+    def _save(self, name, content):
+        directory, filename = os.path.split(name)
+        temp_directory = self.path(directory)
+        os.makedirs(temp_directory, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(
+            dir=temp_directory, prefix='.upload-'
+        )
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                content.seek(0)
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            name = content_name(
+                directory, digest.hexdigest(), os.path.splitext(filename)[1]
+            )
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                return name
+            os.makedirs(
+                os.path.dirname(full_path),
+                self.directory_permissions_mode or 0o777,
+                exist_ok=True
+            )
+            os.chmod(temp_path, self.file_permissions_mode or 0o644)
+            # Одновременная запись того же содержимого заменит файл
+            # идентичным — это безопасно.
+            os.replace(temp_path, full_path)
+            return name
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def detach(self, name):
+        """Уводит файл под временное имя; None, если файла нет."""
+        path = self.path(name)
+        detached = os.path.join(
+            os.path.dirname(path), f'.detached-{uuid.uuid4().hex}'
+        )
+        try:
+            os.replace(path, detached)
+        except FileNotFoundError:
+            return None
+        return detached
+
+    def attach(self, detached, name):
+        # Если файл уже записан заново, замена идентичным безопасна.
+        os.replace(detached, self.path(name))
+
+    def discard(self, detached):
+        os.remove(detached)
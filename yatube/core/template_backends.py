@@ -0,0 +1,67 @@
+import os
+import time
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates, Template
+
+from .metrics import add_template_time
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            add_template_time(time.perf_counter() - started)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Шаблонизатор Django, сообщающий время рендеринга в core.metrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+def _loader_dirs(loaders):
+    for loader in loaders:
+        # cached.Loader оборачивает настоящие загрузчики и своих
+        # каталогов не знает.
+        yield from _loader_dirs(getattr(loader, 'loaders', []))
+        if hasattr(loader, 'get_dirs'):
+            yield from loader.get_dirs()
+
+
+def template_names(engine):
+    """Имена всех шаблонов из каталогов загрузчиков движка."""
+    names = set()
+    for directory in _loader_dirs(engine.template_loaders):
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                names.add(os.path.relpath(path, directory))
+    return sorted(names)
+
+
+def warm_templates():
+    """
+    Компилирует все шаблоны, чтобы cached.Loader держал их в памяти.
+
+    Возвращает список (имя, секунды, ошибка) для отчёта.
+    """
+    results = []
+    for backend in engines.all():
+        engine = backend.engine
+        for name in template_names(engine):
+            started = time.perf_counter()
+            error = None
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError as exc:
+                error = exc
+            results.append((name, time.perf_counter() - started, error))
+    return results
@@ -0,0 +1,15 @@
+class QueryBudgetMixin:
+    """Проверки бюджета SQL-запросов для TestCase."""
+
+    def assertWithinQueryBudget(self, response):
+        metrics = response.metrics
+        self.assertIsNotNone(
+            metrics.budget,
+            f'Для представления {metrics.view} не объявлен query_budget'
+        )
+        self.assertLessEqual(
+            metrics.queries,
+            metrics.budget,
+            f'Представление {metrics.view} выполнило {metrics.queries} '
+            f'SQL-запросов при бюджете {metrics.budget}'
+        )
@@ -0,0 +1,147 @@
+import gzip
+from functools import partial
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+
+from .. import middleware
+from ..compression import accepted, compress, compress_stream, negotiate
+from ..middleware import CompressionMiddleware
+
+User = get_user_model()
+
+HTML = '<p>Пост</p>' * 100
+
+
+def gzip_only(test):
+    """Тесты проверяют gzip и при установленном пакете Brotli."""
+    return mock.patch.object(
+        middleware, 'negotiate', partial(negotiate, available=('gzip',))
+    )(test)
+
+
+class NegotiationTests(SimpleTestCase):
+    def test_accepted_skips_zero_quality(self):
+        self.assertEqual(
+            accepted('gzip;q=0, br; q=0.5, deflate'), {'br', 'deflate'}
+        )
+
+    def test_server_preference_wins(self):
+        """Выбор по порядку сервера; * разрешает любую кодировку."""
+        self.assertEqual(negotiate('gzip, br', ('br', 'gzip')), 'br')
+        self.assertEqual(negotiate('gzip', ('br', 'gzip')), 'gzip')
+        self.assertEqual(negotiate('*', ('gzip',)), 'gzip')
+        self.assertIsNone(negotiate('deflate', ('gzip',)))
+        self.assertIsNone(negotiate(None, ('gzip',)))
+
+    def test_explicit_zero_quality_beats_wildcard(self):
+        """* не возвращает кодировку, явно отклонённую через q=0."""
+        self.assertEqual(negotiate('br;q=0, *', ('br', 'gzip')), 'gzip')
+        self.assertIsNone(negotiate('gzip;q=0, *', ('gzip',)))
+        self.assertIsNone(negotiate('*;q=0', ('br', 'gzip')))
+
+    def test_gzip_is_reproducible(self):
+        """Без времени в заголовке одно содержимое сжимается одинаково."""
+        data = HTML.encode()
+        self.assertEqual(compress(data, 'gzip'), compress(data, 'gzip'))
+        self.assertEqual(compress(data, 'gzip')[4:8], b'\0\0\0\0')
+        self.assertEqual(gzip.decompress(compress(data, 'gzip')), data)
+
+    def test_stream_is_flushed_per_chunk(self):
+        """Каждый кусок сжатого потока уходит сразу и разжимается."""
+        chunks = list(
+            compress_stream(iter([b'a' * 1000, b'b' * 1000]), 'gzip')
+        )
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(
+            gzip.decompress(b''.join(chunks)), b'a' * 1000 + b'b' * 1000
+        )
+
+
+@gzip_only
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, accept='gzip'):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_html_is_compressed(self):
+        response = HttpResponse(HTML)
+        response['ETag'] = '"v1"'
+        response = self.process(response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"v1"')
+        self.assertEqual(
+            response['Content-Length'], str(len(response.content))
+        )
+        self.assertEqual(gzip.decompress(response.content), HTML.encode())
+
+    def test_not_accepted_keeps_body_and_varies(self):
+        response = self.process(HttpResponse(HTML), accept='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response.content, HTML.encode())
+
+    def test_skips_media_short_and_encoded_responses(self):
+        """Картинки, короткие и уже сжатые ответы отдаются как есть."""
+        image = HttpResponse(b'\0' * 1000, content_type='image/webp')
+        short = HttpResponse('<p>Пост</p>')
+        encoded = HttpResponse(b'\0' * 1000)
+        encoded['Content-Encoding'] = 'br'
+        for response in (image, short, encoded):
+            with self.subTest(response=response):
+                content = response.content
+                response = self.process(response)
+                self.assertEqual(response.content, content)
+                self.assertFalse(response.has_header('Vary'))
+
+    def test_streaming_response(self):
+        response = StreamingHttpResponse(
+            iter([b'{"id": 1}\n' * 50, b'{"id": 2}\n' * 50]),
+            content_type='application/x-ndjson'
+        )
+        response = self.process(response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            b'{"id": 1}\n' * 50 + b'{"id": 2}\n' * 50
+        )
+
+
+@gzip_only
+class CachedPageCompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author')
+        Post.objects.create(author=author, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_index_is_compressed_once_per_cache_entry(self):
+        """Сжатая главная берётся из кеша, пока не сменилась страница."""
+        with mock.patch.object(
+            middleware, '_compress', wraps=middleware._compress
+        ) as compress:
+            first = self.client.get(
+                reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip'
+            )
+            second = self.client.get(
+                reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip'
+            )
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(second['Content-Encoding'], 'gzip')
+        self.assertEqual(second.content, first.content)
+        self.assertIn(
+            'Тестовый пост', gzip.decompress(second.content).decode()
+        )
@@ -0,0 +1,55 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+
+from .. import metrics
+from ..concurrent import gather
+
+User = get_user_model()
+
+
+@override_settings(VIEW_QUERY_WORKERS=2)
+class GatherTests(TransactionTestCase):
+    def test_calls_run_in_pool(self):
+        """Первый вызов идёт в текущем потоке, остальные — в пуле."""
+        first, second, value = gather(
+            threading.get_ident, threading.get_ident, lambda: 'ok'
+        )
+        self.assertEqual(first, threading.get_ident())
+        self.assertNotEqual(second, first)
+        self.assertEqual(value, 'ok')
+
+    def test_pool_queries_are_counted(self):
+        """Запросы из пула попадают в показатели текущего запроса."""
+        User.objects.create_user(username='author')
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.activate(request_metrics)
+        try:
+            result = gather(lambda: None, User.objects.count)
+        finally:
+            metrics.deactivate(token)
+        self.assertEqual(result, [None, 1])
+        self.assertEqual(request_metrics.queries, 1)
+
+    def test_pool_checks_connections_around_calls(self):
+        """Поток пула проверяет соединения до и после каждой задачи."""
+        threads = []
+        with mock.patch.object(
+            type(connections['default']), 'close_if_unusable_or_obsolete',
+            lambda connection: threads.append(threading.get_ident())
+        ):
+            _, pool_thread = gather(lambda: None, threading.get_ident)
+        self.assertEqual(
+            threads, [pool_thread] * (2 * len(connections.all()))
+        )
+
+    def test_transaction_runs_calls_in_order(self):
+        """Внутри транзакции всё выполняется в текущем потоке."""
+        with transaction.atomic():
+            User.objects.create_user(username='author')
+            threads = gather(threading.get_ident, threading.get_ident)
+            self.assertEqual(gather(User.objects.count)[0], 1)
+        self.assertEqual(set(threads), {threading.get_ident()})
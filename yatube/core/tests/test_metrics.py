@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+
+from .. import metrics
+from ..metrics import MetricsBuffer, buffer, render_prometheus
+
+User = get_user_model()
+
+
+class MetricsMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        buffer.clear()
+
+    def test_request_metrics_are_recorded(self):
+        """Запрос попадает в буфер с числом запросов и временем."""
+        response = self.client.get(reverse('posts:profile', args=['author']))
+        metrics = response.metrics
+        self.assertEqual(metrics.view, 'posts:profile')
+        self.assertEqual(metrics.status, 200)
+        self.assertGreater(metrics.queries, 0)
+        self.assertGreater(metrics.template_time, 0)
+        self.assertGreaterEqual(metrics.duration, metrics.template_time)
+        self.assertEqual(buffer.snapshot(), [metrics])
+
+    def test_prometheus_endpoint(self):
+        """Эндпоинт отдаёт сводку в текстовом формате Prometheus."""
+        self.client.get(reverse('posts:profile', args=['author']))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(
+            response, 'yatube_db_queries_count{view="posts:profile"} 1'
+        )
+        self.assertContains(
+            response, 'yatube_request_duration_seconds{view="posts:profile",'
+        )
+
+    def test_prometheus_endpoint_is_internal(self):
+        """Снаружи эндпоинт доступен только персоналу."""
+        client = Client(REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(client.get(reverse('metrics')).status_code, 403)
+
+
+class MetricsBufferTests(SimpleTestCase):
+    def record(self, queries, budget=2):
+        record = metrics.RequestMetrics()
+        record.view = 'posts:index'
+        record.queries = queries
+        record.budget = budget
+        return record
+
+    def test_totals_survive_eviction(self):
+        """Итоги и счётчик превышений не уменьшаются при вытеснении."""
+        metrics_buffer = MetricsBuffer(size=1)
+        metrics_buffer.add(self.record(queries=5))
+        metrics_buffer.add(self.record(queries=1))
+        text = render_prometheus(
+            metrics_buffer.snapshot(), metrics_buffer.totals()
+        )
+        self.assertIn('yatube_db_queries_sum{view="posts:index"} 6', text)
+        self.assertIn('yatube_db_queries_count{view="posts:index"} 2', text)
+        self.assertIn(
+            'yatube_db_queries{view="posts:index",quantile="0.5"} 1', text
+        )
+        self.assertIn(
+            'yatube_query_budget_exceeded_total{view="posts:index"} 1', text
+        )
+
+    def test_unbudgeted_queries_extend_budget(self):
+        """Запросы внутри unbudgeted_queries не расходуют бюджет."""
+        record = self.record(queries=1)
+        token = metrics.activate(record)
+        try:
+            with metrics.unbudgeted_queries():
+                record.queries += 3
+        finally:
+            metrics.deactivate(token)
+        self.assertEqual(record.budget, 5)
+        self.assertFalse(record.over_budget)
@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from posts import views
+from posts.models import Post
+
+from ..db.routers import PIN_COOKIE, ReplicaRouter
+from ..middleware import ReplicaMiddleware
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRoutingTests(SimpleTestCase):
+    router = ReplicaRouter()
+
+    def route(self, view, method='get', cookies=None):
+        """Возвращает базу, с которой view читал бы, и ответ middleware."""
+        seen = {}
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen['alias'] = self.router.db_for_read(Post)
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(get_response)
+        request = getattr(RequestFactory(), method)('/')
+        request.COOKIES.update(cookies or {})
+        response = middleware(request)
+        return seen['alias'], response
+
+    def test_read_views_use_replica(self):
+        """Ленты читают с реплики, вне запроса чтение идёт в default."""
+        for view in (views.index, views.group_posts, views.profile,
+                     views.post_detail, views.follow_index):
+            with self.subTest(view=view.__name__):
+                alias, response = self.route(view)
+                self.assertEqual(alias, 'replica1')
+                self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_writes_pin_user_to_primary(self):
+        """После записи пользователь получает cookie и читает с default."""
+        for view, method in ((views.post_create, 'post'),
+                             (views.post_edit, 'post'),
+                             (views.add_comment, 'post'),
+                             (views.profile_follow, 'get')):
+            with self.subTest(view=view.__name__):
+                alias, response = self.route(view, method)
+                self.assertIsNone(alias)
+                self.assertEqual(
+                    response.cookies[PIN_COOKIE]['max-age'], 15
+                )
+        alias, _ = self.route(views.index, cookies={PIN_COOKIE: '1'})
+        self.assertIsNone(alias)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_default(self):
+        alias, _ = self.route(views.index)
+        self.assertIsNone(alias)
+
+    def test_writes_and_migrations_stay_on_primary(self):
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+
+
+class ReadYourWritesTests(TestCase):
+    def test_new_post_is_visible_right_after_create(self):
+        """Автор сразу видит свой пост: профиль читается с default."""
+        user = User.objects.create_user(username='author')
+        self.client.force_login(user)
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Свежий пост'}, follow=True
+        )
+        self.assertIn(PIN_COOKIE, self.client.cookies)
+        self.assertContains(response, 'Свежий пост')
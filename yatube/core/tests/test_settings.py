@@ -0,0 +1,56 @@
+import os
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from yatube.settings.environment import cache, database, databases
+
+
+class EnvironmentSettingsTests(SimpleTestCase):
+    def test_sqlite_is_default_database(self):
+        """Без переменных окружения используется настроенный SQLite."""
+        with mock.patch.dict(os.environ, clear=True):
+            config = database('/srv/yatube')
+        self.assertEqual(config['ENGINE'], 'core.db.backends.sqlite3')
+        self.assertEqual(config['NAME'], '/srv/yatube/db.sqlite3')
+
+    def test_postgresql_keeps_connections(self):
+        """PostgreSQL настраивается из окружения с CONN_MAX_AGE."""
+        environ = {
+            'YATUBE_DB_ENGINE': 'postgresql',
+            'YATUBE_DB_HOST': 'db',
+        }
+        with mock.patch.dict(os.environ, environ, clear=True):
+            config = database('/srv/yatube', conn_max_age=60)
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(config['HOST'], 'db')
+        self.assertEqual(config['CONN_MAX_AGE'], 60)
+
+    def test_replicas_mirror_primary(self):
+        """Реплики копируют default с другим хостом и зеркалят её в тестах."""
+        environ = {
+            'YATUBE_DB_ENGINE': 'postgresql',
+            'YATUBE_DB_REPLICAS': 'replica-a,replica-b',
+        }
+        with mock.patch.dict(os.environ, environ, clear=True):
+            config = databases('/srv/yatube')
+        self.assertEqual(
+            list(config), ['default', 'replica1', 'replica2']
+        )
+        self.assertEqual(config['replica2']['HOST'], 'replica-b')
+        self.assertEqual(config['replica2']['NAME'], config['default']['NAME'])
+        self.assertEqual(config['replica1']['TEST'], {'MIRROR': 'default'})
+
+    def test_cache_backend_is_pluggable(self):
+        """Кеш выбирается переменной YATUBE_CACHE."""
+        with mock.patch.dict(os.environ, {'YATUBE_CACHE': 'file'}):
+            config = cache('/srv/yatube')
+        self.assertEqual(
+            config['BACKEND'],
+            'django.core.cache.backends.filebased.FileBasedCache'
+        )
+        self.assertEqual(config['LOCATION'], '/srv/yatube/cache')
+        with mock.patch.dict(os.environ, {'YATUBE_CACHE': 'nope'}):
+            with self.assertRaises(ImproperlyConfigured):
+                cache('/srv/yatube')
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import tempfile
+
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase
+
+from core.db.backends.sqlite3.base import DatabaseWrapper
+
+
+class TunedSqliteTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.wrapper = self.make_wrapper(
+            os.path.join(directory.name, 'tuned.sqlite3')
+        )
+
+    def make_wrapper(self, name, **options):
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': name, 'OPTIONS': options},
+            alias='tuned'
+        )
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, name):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connection_pragmas(self):
+        """Соединение открывается в WAL с synchronous=NORMAL и тайм-аутом."""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+
+    def test_transactions_are_serialized(self):
+        """Транзакция держит блокировку записи до фиксации."""
+        # Так транзакцию начинает и завершает transaction.atomic.
+        self.wrapper.set_autocommit(
+            False, force_begin_transaction_with_broken_autocommit=True
+        )
+        self.assertTrue(self.wrapper.holds_write_lock)
+        self.assertFalse(self.wrapper.write_lock.acquire(blocking=False))
+        self.wrapper.commit()
+        self.wrapper.set_autocommit(True)
+        self.assertFalse(self.wrapper.holds_write_lock)
+        self.assertTrue(self.wrapper.write_lock.acquire(blocking=False))
+        self.wrapper.write_lock.release()
+
+    def test_failed_begin_releases_write_lock(self):
+        """Если BEGIN IMMEDIATE не прошёл, блокировка не остаётся занятой."""
+        name = self.wrapper.settings_dict['NAME']
+        self.pragma('journal_mode')
+        # Писатель из другого процесса очередь процесса не проходит.
+        other = sqlite3.connect(name, isolation_level=None)
+        self.addCleanup(other.close)
+        other.execute('BEGIN IMMEDIATE')
+        wrapper = self.make_wrapper(name, pragmas={'busy_timeout': 10})
+        with self.assertRaises(OperationalError):
+            wrapper.set_autocommit(
+                False, force_begin_transaction_with_broken_autocommit=True
+            )
+        self.assertFalse(wrapper.holds_write_lock)
+        self.assertTrue(wrapper.write_lock.acquire(blocking=False))
+        wrapper.write_lock.release()
@@ -0,0 +1,114 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from core.static import IMMUTABLE, REVALIDATE, StaticFilesApplication
+
+
+def django_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'django']
+
+
+class StaticFilesTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        cls.settings = override_settings(
+            STATIC_ROOT=cls.root,
+            STATICFILES_STORAGE=(
+                'core.staticfiles.CompressedManifestStaticFilesStorage'
+            ),
+        )
+        cls.settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.app = StaticFilesApplication(
+            django_app, cls.root, settings.STATIC_URL
+        )
+        cls.css = staticfiles_storage.stored_name('css/bootstrap.min.css')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.root, ignore_errors=True)
+        super().tearDownClass()
+
+    def request(self, path, method='GET', **headers):
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': method}
+        environ.update(headers)
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        body = b''.join(self.app(environ, start_response))
+        return response['status'], response['headers'], body
+
+    def test_collectstatic_writes_hashed_and_compressed_copies(self):
+        """Хешированные имена и .gz только для сжимаемых файлов."""
+        self.assertRegex(self.css, r'^css/bootstrap\.min\.[0-9a-f]{12}\.css$')
+        with open(os.path.join(self.root, self.css), 'rb') as file:
+            original = file.read()
+        with gzip.open(os.path.join(self.root, self.css + '.gz')) as file:
+            self.assertEqual(file.read(), original)
+        logo = staticfiles_storage.stored_name('img/logo.png')
+        self.assertFalse(os.path.exists(os.path.join(self.root, logo + '.gz')))
+
+    def test_hashed_file_is_immutable_and_negotiated(self):
+        status, headers, body = self.request(
+            '/static/' + self.css, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Cache-Control'], IMMUTABLE)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(headers['Content-Type'], 'text/css; charset=utf-8')
+        self.assertEqual(int(headers['Content-Length']), len(body))
+        with open(os.path.join(self.root, self.css), 'rb') as file:
+            self.assertEqual(gzip.decompress(body), file.read())
+
+    def test_identity_without_accept_encoding(self):
+        status, headers, body = self.request(
+            '/static/' + self.css, HTTP_ACCEPT_ENCODING='gzip;q=0'
+        )
+        self.assertNotIn('Content-Encoding', headers)
+        with open(os.path.join(self.root, self.css), 'rb') as file:
+            self.assertEqual(body, file.read())
+
+    def test_unhashed_name_revalidates_with_etag(self):
+        """Исходное имя отдаётся с коротким max-age; ETag даёт 304."""
+        _, headers, _ = self.request('/static/css/bootstrap.min.css')
+        self.assertEqual(headers['Cache-Control'], REVALIDATE)
+        status, _, body = self.request(
+            '/static/css/bootstrap.min.css',
+            HTTP_IF_NONE_MATCH=headers['ETag']
+        )
+        self.assertEqual(status, '304 Not Modified')
+        self.assertEqual(body, b'')
+
+    def test_head_and_methods(self):
+        status, headers, body = self.request('/static/' + self.css, 'HEAD')
+        self.assertEqual(status, '200 OK')
+        self.assertTrue(int(headers['Content-Length']))
+        self.assertEqual(body, b'')
+        status, _, _ = self.request('/static/' + self.css, 'POST')
+        self.assertEqual(status, '405 Method Not Allowed')
+
+    def test_other_paths_go_to_django(self):
+        for path in ('/', '/static/missing.css', '/static/staticfiles.json'):
+            with self.subTest(path=path):
+                self.assertEqual(self.request(path)[2], b'django')
+
+    def test_static_url_uses_hashed_name(self):
+        self.assertEqual(
+            staticfiles_storage.url('css/bootstrap.min.css'),
+            '/static/' + self.css
+        )
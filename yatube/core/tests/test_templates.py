@@ -0,0 +1,46 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from ..template_backends import warm_templates
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )],
+    },
+}]
+
+
+class TemplateWarmupTests(SimpleTestCase):
+    def test_all_project_templates_compile(self):
+        """Все шаблоны проекта находятся и компилируются без ошибок."""
+        results = warm_templates()
+        names = {name for name, _, _ in results}
+        self.assertIn('posts/post_card.html', names)
+        self.assertIn('includes/header.html', names)
+        self.assertEqual([name for name, _, error in results if error], [])
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_warmup_fills_cached_loader(self):
+        """После прогрева cached.Loader отдаёт шаблоны из памяти."""
+        warm_templates()
+        loader = engines.all()[0].engine.template_loaders[0]
+        self.assertIn('base.html', loader.get_template_cache)
+
+    def test_command_reports_parse_time(self):
+        """Команда печатает число шаблонов и время разбора."""
+        out = StringIO()
+        call_command('warm_templates', stdout=out)
+        self.assertIn('Шаблонов:', out.getvalue())
@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
 
+from .metrics import buffer, render_prometheus
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -11,3 +15,15 @@ def csrf_failure(request, reason=''):
 
 def server_error(request, ):
     return render(request, 'core/500.html', status=500)
+
+
+def metrics(request):
+    if (
+        request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS
+        and not request.user.is_staff
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_prometheus(buffer.snapshot(), buffer.totals()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,92 @@
+"""
+Кодировщик BlurHash: короткая строка, из которой клиент рисует размытую
+заглушку изображения, пока оно грузится.
+
+Алгоритм — https://github.com/woltapp/blurhash: коэффициенты DCT
+в линейном RGB, упакованные в base83. Считается по уже уменьшенной
+копии, поэтому на чистом Python укладывается в миллисекунды.
+"""
+import math
+
+CHARACTERS = (
+    '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    'abcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+)
+# Сторона копии, по которой считаются коэффициенты.
+SAMPLE_SIZE = 32
+
+
+def _base83(value, length):
+    return ''.join(
+        CHARACTERS[value // 83 ** (length - i - 1) % 83]
+        for i in range(length)
+    )
+
+
+def _linear(value):
+    value /= 255
+    if value <= 0.04045:
+        return value / 12.92
+    return ((value + 0.055) / 1.055) ** 2.4
+
+
+def _srgb(value):
+    value = max(0.0, min(1.0, value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value, exponent):
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def encode(image, x_components=4, y_components=3):
+    """BlurHash изображения PIL; копия уменьшается до SAMPLE_SIZE."""
+    sample = image.convert('RGB')
+    sample.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE))
+    width, height = sample.size
+    table = [_linear(value) for value in range(256)]
+    pixels = [
+        (table[r], table[g], table[b]) for r, g, b in sample.getdata()
+    ]
+    factors = []
+    for j in range(y_components):
+        rows = [math.cos(math.pi * j * y / height) for y in range(height)]
+        for i in range(x_components):
+            columns = [
+                math.cos(math.pi * i * x / width) for x in range(width)
+            ]
+            red = green = blue = 0.0
+            for y, row in enumerate(rows):
+                offset = y * width
+                for x, column in enumerate(columns):
+                    basis = row * column
+                    r, g, b = pixels[offset + x]
+                    red += basis * r
+                    green += basis * g
+                    blue += basis * b
+            scale = (1 if i == j == 0 else 2) / (width * height)
+            factors.append((red * scale, green * scale, blue * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83(x_components - 1 + (y_components - 1) * 9, 1)
+    if ac:
+        actual_max = max(abs(value) for factor in ac for value in factor)
+        quantised_max = max(0, min(82, int(actual_max * 166 - 0.5)))
+        max_value = (quantised_max + 1) / 166
+    else:
+        quantised_max, max_value = 0, 1
+    result += _base83(quantised_max, 1)
+    result += _base83(
+        (_srgb(dc[0]) << 16) + (_srgb(dc[1]) << 8) + _srgb(dc[2]), 4
+    )
+    for factor in ac:
+        r, g, b = (
+            max(0, min(18, math.floor(
+                _sign_pow(value / max_value, 0.5) * 9 + 9.5
+            )))
+            for value in factor
+        )
+        result += _base83(r * 19 * 19 + g * 19 + b, 2)
+    return result
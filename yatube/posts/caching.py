@@ -0,0 +1,107 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .thumbnails import card_image
+
+INDEX_GENERATION_KEY = 'index:generation'
+NAMES_GENERATION_KEY = 'names:generation'
+
+
+def _generation(key):
+    """Время последнего сброса; заводится при первом обращении."""
+    generation = cache.get(key)
+    if generation is None:
+        generation = time.time()
+        cache.add(key, generation, None)
+        generation = cache.get(key, generation)
+    return generation
+
+
+def index_generation():
+    return _generation(INDEX_GENERATION_KEY)
+
+
+def names_generation():
+    """Меняется, когда меняются имена пользователей или группы."""
+    return _generation(NAMES_GENERATION_KEY)
+
+
+def index_cache_key(request):
+    """Ключ страницы главной ленты: поколение, вариант, номер/курсор."""
+    variant = 'auth' if request.user.is_authenticated else 'anon'
+    position = '{}|{}'.format(
+        request.GET.get('page', ''), request.GET.get('cursor', '')
+    )
+    digest = hashlib.md5(position.encode()).hexdigest()
+    return f'index:{index_generation()}:{variant}:{digest}'
+
+
+def invalidate_index():
+    """Сбрасывает все закешированные страницы главной ленты разом."""
+    cache.set(INDEX_GENERATION_KEY, time.time(), None)
+
+
+def invalidate_names():
+    cache.set(NAMES_GENERATION_KEY, time.time(), None)
+
+
+def detach_page(page_obj):
+    """
+    Готовит страницу пагинатора к сохранению в кеш.
+
+    Pickle запроса целиком выполнил бы его для всей ленты, поэтому
+    в кеш уходят только посты текущей страницы.
+    """
+    page_obj.object_list = list(page_obj.object_list)
+    # Считаем заранее: после отвязки запроса COUNT(*) уже не выполнить.
+    page_obj.paginator.num_pages
+    page_obj.paginator.object_list = None
+    return page_obj
+
+
+def card_cache_key(post, in_group):
+    """
+    Ключ отрендеренной карточки поста.
+
+    В версию входит всё, что выводит карточка: правка поста меняет
+    updated_at, смена имени автора или числа комментариев меняет
+    хеш, так что устаревшие карточки просто перестают читаться.
+    """
+    author = post.author
+    version = '|'.join(map(str, (
+        post.updated_at.timestamp(),
+        post.comments_count,
+        author.username,
+        author.first_name,
+        author.last_name,
+        post.group_id and post.group.slug,
+        in_group,
+    )))
+    digest = hashlib.md5(version.encode()).hexdigest()
+    return f'card:{post.id}:{digest}'
+
+
+def render_post_cards(posts, request, group=None):
+    """Карточки страницы одним get_many; промахи рендерятся и кладутся."""
+    posts = list(posts)
+    keys = [card_cache_key(post, group is not None) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {}
+    for key, post in zip(keys, posts):
+        if key in cards:
+            continue
+        cards[key] = render_to_string(
+            'posts/post_card.html', {'post': post, 'group': group}, request
+        )
+        # Пока превью строится в фоне, карточка ссылается на оригинал;
+        # такую не кешируем, чтобы превью появилось сразу после генерации.
+        if not post.image or card_image(post.image) is not None:
+            missing[key] = cards[key]
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_CACHE_DURATION)
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,94 @@
+"""
+Валидаторы условных GET для лент и страницы поста.
+
+ETag считается по дешёвым метаданным, без рендеринга и JOIN страницы:
+для ленты — id, updated_at и comments_count строк текущей страницы
+(узкий запрос по тому же индексу), для поста — его версия и счётчики.
+Зритель и его сессия тоже входят в ETag: другому пользователю
+показывается другая страница.
+"""
+import hashlib
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+from .caching import index_generation, names_generation
+from .models import Follow, Post, User
+from .pagination import get_feed_page
+
+PAGE_VERSION_FIELDS = ('id', 'pub_date', 'updated_at', 'comments_count')
+
+
+def _etag(request, *parts):
+    raw = '|'.join(str(part) for part in (
+        request.get_full_path(),
+        request.user.id,
+        # Ключ сессии меняется при входе вместе с CSRF-токеном в форме.
+        request.session.session_key,
+        names_generation(),
+        *parts,
+    ))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _page_version(posts, request):
+    page_obj = get_feed_page(
+        posts.values(*PAGE_VERSION_FIELDS), request, settings.MAX_POSTS
+    )
+    return page_obj.paginator.num_pages, [
+        tuple(row.values()) for row in page_obj.object_list
+    ]
+
+
+def index_etag(request):
+    # Поколение сбрасывается при любом изменении постов и комментариев.
+    return _etag(request, index_generation())
+
+
+def index_last_modified(request):
+    """
+    Поколения — метки времени последних изменений, но страница зависит
+    и от зрителя, поэтому Last-Modified отдаётся только анонимам.
+    """
+    if request.user.is_authenticated:
+        return None
+    return datetime.fromtimestamp(
+        max(index_generation(), names_generation()), timezone.utc
+    )
+
+
+def group_etag(request, slug):
+    return _etag(
+        request, _page_version(Post.objects.filter(group__slug=slug), request)
+    )
+
+
+def profile_etag(request, username):
+    profile = User.objects.filter(username=username).annotate(
+        followed=Exists(
+            Follow.objects.filter(
+                author=OuterRef('pk'), user_id=request.user.id
+            )
+        )
+    ).values_list(
+        'profile__posts_count',
+        'profile__followers_count',
+        'profile__following_count',
+        'followed'
+    ).first()
+    return _etag(
+        request,
+        profile,
+        _page_version(Post.objects.filter(author__username=username), request)
+    )
+
+
+def post_etag(request, post_id):
+    # Комментарии не редактируются: новые и удалённые видны по счётчику.
+    return _etag(
+        request,
+        Post.objects.filter(id=post_id).values_list(
+            'updated_at', 'comments_count', 'author__profile__posts_count'
+        ).first()
+    )
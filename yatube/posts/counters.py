@@ -0,0 +1,76 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, Profile, User
+
+
+def _shift(queryset, field, delta):
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gt': 0})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def shift_profile(user_id, field, delta):
+    """Атомарно сдвигает счётчик профиля; без профиля пересчитывает его.
+
+    При уменьшении профиль не создаётся: каскадное удаление пользователя
+    удаляет профиль раньше его постов и подписок.
+    """
+    profiles = Profile.objects.filter(user_id=user_id)
+    if (
+        not _shift(profiles, field, delta)
+        and delta > 0
+        and not profiles.exists()
+    ):
+        recount_profile(user_id)
+
+
+def shift_comments(post_id, delta):
+    _shift(Post.objects.filter(pk=post_id), 'comments_count', delta)
+
+
+def _count(model, field, outer='pk'):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef(outer)})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0
+    )
+
+
+def recount_profile(user_id):
+    Profile.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            'posts_count': Post.objects.filter(author_id=user_id).count(),
+            'followers_count': Follow.objects.filter(
+                author_id=user_id
+            ).count(),
+            'following_count': Follow.objects.filter(
+                user_id=user_id
+            ).count(),
+        }
+    )
+
+
+def recount_all():
+    """Пересчитывает все счётчики несколькими UPDATE без выборки строк."""
+    missing = User.objects.filter(profile__isnull=True).values_list(
+        'pk', flat=True
+    )
+    Profile.objects.bulk_create(
+        (Profile(user_id=user_id) for user_id in missing.iterator()),
+        batch_size=500,
+        ignore_conflicts=True
+    )
+    profiles = Profile.objects.update(
+        posts_count=_count(Post, 'author', 'user'),
+        followers_count=_count(Follow, 'author', 'user'),
+        following_count=_count(Follow, 'user', 'user'),
+    )
+    posts = Post.objects.update(comments_count=_count(Comment, 'post'))
+    return profiles, posts
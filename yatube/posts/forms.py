@@ -1,5 +1,9 @@
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
 
+from .images import (release_on_commit, restore_on_commit,
+                     schedule_processing)
 from .models import Comment, Post
 
 
@@ -8,6 +12,32 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = ('text', 'group', 'image')
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if image and image.size > settings.IMAGE_UPLOAD_MAX_SIZE:
+            raise forms.ValidationError(
+                'Файл больше {}'.format(
+                    filesizeformat(settings.IMAGE_UPLOAD_MAX_SIZE)
+                )
+            )
+        return image
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.initial_image = self.instance.image.name
+
+    def _save_m2m(self):
+        # Вызывается уже после сохранения поста: из save() или, при
+        # commit=False, из save_m2m(); имя файла к этому моменту итоговое.
+        super()._save_m2m()
+        if 'image' in self.changed_data:
+            if self.instance.image:
+                restore_on_commit(
+                    self.instance.image.name, self.cleaned_data['image']
+                )
+            schedule_processing(self.instance.image)
+            release_on_commit(self.initial_image)
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
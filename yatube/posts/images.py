@@ -0,0 +1,174 @@
+"""
+Обработка загруженных изображений постов вне запроса.
+
+Загрузка пишется на диск кусками (TemporaryFileUploadHandler), форма
+проверяет только размер файла и то, что это картинка. Дальше в пуле
+превью оригинал поворачивается по EXIF, уменьшается до IMAGE_MAX_SIZE
+и перекодируется в WebP (без поддержки WebP — в progressive JPEG) без
+метаданных. Пост получает новый файл, его размеры и blurhash, оригинал
+освобождается, а превью карточки строится из уже уменьшенного файла.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+from sorl.thumbnail.images import ImageFile
+
+from . import blurhash
+from .caching import invalidate_index
+from .models import Post
+from .thumbnails import backend, generate, schedule
+
+logger = logging.getLogger(__name__)
+
+storage = Post._meta.get_field('image').storage
+
+
+def output_format():
+    if settings.IMAGE_FORMAT == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return settings.IMAGE_FORMAT
+
+
+def _flatten(image, image_format):
+    """Режим, который умеет формат; прозрачность JPEG — на белом фоне."""
+    has_alpha = image.mode in ('RGBA', 'LA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+    if not has_alpha:
+        return image.convert('RGB')
+    image = image.convert('RGBA')
+    if image_format == 'WEBP':
+        return image
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def encode(source):
+    """
+    Перекодирует файл: (байты, ширина, высота, blurhash).
+
+    Исходник декодируется один раз: JPEG через draft() — сразу
+    в уменьшенном масштабе, — остальное считается по этой копии.
+    """
+    image = Image.open(source)
+    image.draft('RGB', settings.IMAGE_MAX_SIZE)
+    icc_profile = image.info.get('icc_profile')
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(settings.IMAGE_MAX_SIZE, Image.LANCZOS)
+    image_format = output_format()
+    image = _flatten(image, image_format)
+    options = {'quality': settings.IMAGE_QUALITY}
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    if image_format == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    elif image_format == 'WEBP':
+        options['method'] = 4
+    buffer = BytesIO()
+    # EXIF не передаётся и в файл не попадает.
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue(), image.width, image.height, blurhash.encode(
+        image
+    )
+
+
+def process(name):
+    """
+    Заменяет загруженный оригинал обработанным файлом.
+
+    Пост ищется по имени файла: если картинку успели сменить, результат
+    выбрасывается. True, если файл заменён.
+    """
+    try:
+        with storage.open(name) as source:
+            content, width, height, placeholder = encode(source)
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', name)
+        return False
+    extension = 'jpg' if output_format() == 'JPEG' else 'webp'
+    new_name = storage.save(
+        Post.image.field.generate_filename(None, f'image.{extension}'),
+        ContentFile(content)
+    )
+    updated = Post.objects.filter(image=name).update(
+        image=new_name,
+        image_width=width,
+        image_height=height,
+        image_blurhash=placeholder,
+        # Новая версия поста: кеш карточек и ETag ссылаются на файл.
+        updated_at=timezone.now()
+    )
+    if not updated:
+        release(new_name)
+        return False
+    invalidate_index()
+    release(name)
+    generate(new_name)
+    return True
+
+
+def _referenced(name):
+    return Post.objects.using(DEFAULT_DB_ALIAS).filter(image=name).exists()
+
+
+def release(name):
+    """
+    Удаляет файл вместе с превью, если на него больше не ссылается ни
+    один пост: одинаковые загрузки делят один файл (core.storage).
+
+    Загрузка того же содержимого могла найти файл уже после первой
+    проверки, поэтому ссылки проверяются ещё раз, когда файл уведён
+    из-под своего имени; нашлась ссылка — файл возвращается.
+    """
+    if not name or _referenced(name):
+        return False
+    try:
+        detached = storage.detach(name)
+        if _referenced(name):
+            if detached:
+                storage.attach(detached, name)
+            return False
+        # Только превью и записи sorl: под этим именем уже может лежать
+        # файл, заново записанный одновременной загрузкой.
+        backend.delete(ImageFile(name, storage), delete_file=False)
+        if detached:
+            storage.discard(detached)
+    except Exception:
+        # Уборка не должна ломать удаление поста.
+        logger.exception('Не удалось удалить изображение %s', name)
+        return False
+    return True
+
+
+def release_on_commit(name):
+    transaction.on_commit(lambda: release(name))
+
+
+def restore(name, content):
+    """
+    Записывает загрузку заново, если её общий файл удалили между
+    дедупликацией в хранилище и сохранением поста.
+    """
+    if name and not storage.exists(name):
+        storage.save(
+            Post.image.field.generate_filename(
+                None, os.path.basename(name)
+            ),
+            content
+        )
+
+
+def restore_on_commit(name, content):
+    transaction.on_commit(lambda: restore(name, content))
+
+
+def schedule_processing(image):
+    """Обработка после коммита; превью — по её окончании, тем же заданием."""
+    schedule(image, job=process)
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты, комментарии и подписки в NDJSON или CSV: '
+        'все таблицы целиком или данные одного пользователя (--user).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=tuple(export.FORMATS),
+            default='ndjson',
+            help='Формат выгрузки (по умолчанию ndjson).'
+        )
+        parser.add_argument(
+            '--kind',
+            action='append',
+            help='Таблица; можно повторять. По умолчанию все. '
+                 'Для CSV — ровно одна.'
+        )
+        parser.add_argument(
+            '--user',
+            help='Выгрузить только данные этого пользователя.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл выгрузки; по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из базы за раз.'
+        )
+
+    def handle(self, *args, **options):
+        kinds = options['kind']
+        available = export.USER_FIELDS if options['user'] else (
+            export.DUMP_FIELDS
+        )
+        unknown = set(kinds or ()) - set(available)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные таблицы: {", ".join(sorted(unknown))}; '
+                f'есть {", ".join(available)}'
+            )
+        if options['format'] == 'csv' and len(kinds or available) != 1:
+            raise CommandError('CSV выгружает одну таблицу, укажите --kind')
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'Нет пользователя {options["user"]}')
+            tables = export.user_tables(user, kinds)
+        else:
+            tables = export.dump_tables(kinds)
+        chunks = export.stream(
+            tables, options['format'], options['chunk_size']
+        )
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stderr.write(
+            self.style.SUCCESS(f'Выгрузка записана в {options["output"]}')
+        )
@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.images import process
+from posts.models import Post
+from posts.thumbnails import generate
+
+BATCH_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = (
+        'Заранее строит превью для всех изображений постов. Ещё не '
+        'обработанные загрузки сначала перекодируются (posts.images).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.THUMBNAIL_WORKERS or 1,
+            help='Число потоков генерации.'
+        )
+
+    def handle(self, *args, **options):
+        images = Post.objects.exclude(image='').order_by().values_list(
+            'image', 'image_width'
+        ).distinct().iterator()
+        built = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                batch = list(islice(images, BATCH_SIZE))
+                if not batch:
+                    break
+                for ok in pool.map(
+                    lambda image: (generate if image[1] else process)(
+                        image[0]
+                    ),
+                    batch
+                ):
+                    built += ok
+                    failed += not ok
+        self.stdout.write(
+            self.style.SUCCESS(f'Построено превью: {built}, ошибок: {failed}')
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Group, Post
+from posts.search import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс постов и групп.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько документов индексировать в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        indexed = rebuild(
+            Post.objects.only('id', 'text').order_by(),
+            Group.objects.only('id', 'title', 'description'),
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано документов: {indexed}')
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import recount_all
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики профилей и постов.'
+
+    def handle(self, *args, **options):
+        profiles, posts = recount_all()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Пересчитано профилей: {profiles}, постов: {posts}'
+            )
+        )
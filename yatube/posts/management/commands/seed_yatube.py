@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+from posts.counters import recount_all
+from posts.models import Group, Post
+from posts.search import rebuild
+from posts.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует большой синтетический набор данных через bulk_create. '
+        'Сигналы при этом не срабатывают, поэтому счётчики, ленты и '
+        'поисковый индекс пересчитываются в конце.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', 1000),
+            ('groups', 50),
+            ('posts', 100000),
+            ('comments', 300000),
+            ('follows', 50000),
+        ):
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Сколько создать: {name} (по умолчанию {default}).'
+            )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько строк вставлять одним bulk_create.'
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=3.0,
+            help='Крутизна степенного распределения подписчиков и постов.'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='За сколько дней распределить даты публикации.'
+        )
+        parser.add_argument('--seed', type=int, help='Зерно генератора.')
+        parser.add_argument(
+            '--skip-derived',
+            action='store_true',
+            help='Не пересчитывать счётчики, ленты и поисковый индекс.'
+        )
+
+    def step(self, label, action, *args):
+        started = time.monotonic()
+        result = action(*args)
+        self.stdout.write(
+            f'{label}: {result} за {time.monotonic() - started:.1f} с'
+        )
+
+    def handle(self, *args, **options):
+        seeder = Seeder(
+            batch_size=options['batch_size'],
+            skew=options['skew'],
+            days=options['days'],
+            seed=options['seed']
+        )
+        self.step('Пользователи', seeder.users, options['users'])
+        self.step('Группы', seeder.groups, options['groups'])
+        self.step('Посты', seeder.posts, options['posts'])
+        self.step('Комментарии', seeder.comments, options['comments'])
+        self.step('Подписки', seeder.follows, options['follows'])
+        if not options['skip_derived']:
+            self.step('Счётчики (профили, посты)', recount_all)
+            self.step('Записи лент', timeline.rebuild)
+            self.step(
+                'Поисковый индекс',
+                rebuild,
+                Post.objects.only('id', 'text').order_by(),
+                Group.objects.only('id', 'title', 'description'),
+                options['batch_size']
+            )
+        self.stdout.write(self.style.SUCCESS('Готово'))
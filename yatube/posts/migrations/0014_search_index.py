@@ -0,0 +1,154 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:16
+
+import re
+from collections import Counter
+from itertools import chain, islice
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+
+BATCH_SIZE = 1000
+GROUP_TITLE_WEIGHT = 5.0
+WORD = re.compile(r'\w+')
+FTS_TABLES = {
+    'posts_post_fts': ('body', ''),
+    'posts_group_fts': ('title, description', '5.0, 1.0'),
+}
+
+
+def create_fts_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table, (columns, weights) in FTS_TABLES.items():
+            try:
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE {table} USING fts5({columns}, '
+                    "tokenize='unicode61 remove_diacritics 2')"
+                )
+            except OperationalError:
+                # SQLite собран без FTS5: работает запасной индекс.
+                return
+            if weights:
+                cursor.execute(
+                    f'INSERT INTO {table} ({table}, rank) '
+                    f"VALUES ('rank', 'bm25({weights})')"
+                )
+
+
+def drop_fts_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in FTS_TABLES:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+def _batches(rows, size=BATCH_SIZE):
+    rows = iter(rows)
+    batch = list(islice(rows, size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, size))
+
+
+def _search_terms(kind, pk, weighted_texts, stem):
+    weights = Counter()
+    for text, weight in weighted_texts:
+        terms = [stem(word) for word in WORD.findall(text)]
+        for term in terms:
+            weights[term[:64]] += weight / len(terms) ** 0.5
+    return [
+        (term, kind, pk, weight) for term, weight in weights.items()
+    ]
+
+
+def fill_search_index(apps, schema_editor):
+    """Индексирует посты и группы, созданные до появления поиска."""
+    # Основы — тем же стеммером, что и у запросов; после его правок индекс
+    # всё равно перестраивают командой rebuild_search_index.
+    from posts.stemmer import stem
+
+    def stemmed(text):
+        return ' '.join(stem(word) for word in WORD.findall(text))
+
+    connection = schema_editor.connection
+    db = connection.alias
+    posts = apps.get_model('posts', 'Post').objects.using(db).order_by()
+    groups = apps.get_model('posts', 'Group').objects.using(db).order_by()
+    posts = posts.values_list('id', 'text')
+    groups = groups.values_list('id', 'title', 'description')
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+    if 'posts_post_fts' in tables:
+        with connection.cursor() as cursor:
+            for batch in _batches(posts.iterator()):
+                cursor.executemany(
+                    'INSERT INTO posts_post_fts (rowid, body) '
+                    'VALUES (%s, %s)',
+                    [(pk, stemmed(text)) for pk, text in batch]
+                )
+            for batch in _batches(groups.iterator()):
+                cursor.executemany(
+                    'INSERT INTO posts_group_fts (rowid, title, description) '
+                    'VALUES (%s, %s, %s)',
+                    [
+                        (pk, stemmed(title), stemmed(description))
+                        for pk, title, description in batch
+                    ]
+                )
+        return
+    SearchTerm = apps.get_model('posts', 'SearchTerm')
+    rows = chain(
+        (
+            _search_terms('post', pk, [(text, 1.0)], stem)
+            for pk, text in posts.iterator()
+        ),
+        (
+            _search_terms(
+                'group',
+                pk,
+                [(title, GROUP_TITLE_WEIGHT), (description, 1.0)],
+                stem
+            )
+            for pk, title, description in groups.iterator()
+        ),
+    )
+    for batch in _batches(chain.from_iterable(rows)):
+        SearchTerm.objects.using(db).bulk_create(
+            SearchTerm(term=term, kind=kind, object_id=pk, weight=weight)
+            for term, kind, pk, weight in batch
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_profile_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='основа слова')),
+                ('kind', models.CharField(choices=[('post', 'пост'), ('group', 'группа')], max_length=5, verbose_name='тип документа')),
+                ('object_id', models.PositiveIntegerField(verbose_name='id документа')),
+                ('weight', models.FloatField(verbose_name='вес')),
+            ],
+            options={
+                'verbose_name_plural': 'поисковый индекс',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['kind', 'term', 'object_id'], name='search_kind_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['kind', 'object_id'], name='search_kind_object_idx'),
+        ),
+        migrations.RunPython(create_fts_tables, drop_fts_tables),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
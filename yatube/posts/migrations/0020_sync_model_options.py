@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:09
+
+from django.db import migrations, models
+
+
+# Правки Meta и подсказок полей, внесённые в модели без миграции.
+# Столбцы не меняются; вынесено из 0011, чтобы не смешивать с индексом ленты.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_post_image_content_addressed'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'verbose_name_plural': 'комментарии'},
+        ),
+        migrations.AlterModelOptions(
+            name='group',
+            options={'verbose_name_plural': 'Группы'},
+        ),
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ('-pub_date',), 'verbose_name_plural': 'посты'},
+        ),
+        migrations.AlterField(
+            model_name='group',
+            name='description',
+            field=models.TextField(help_text='Опишите тематику группы.', verbose_name='Описание'),
+        ),
+        migrations.AlterField(
+            model_name='group',
+            name='slug',
+            field=models.SlugField(help_text='Укажите slug.', unique=True),
+        ),
+        migrations.AlterField(
+            model_name='group',
+            name='title',
+            field=models.CharField(help_text='Введите название группы', max_length=200, verbose_name='Название'),
+        ),
+    ]
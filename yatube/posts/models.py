@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from core.storage import ContentAddressedStorage
+
 User = get_user_model()
 
 
@@ -35,6 +37,10 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name='дата публикации'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='дата изменения'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -52,13 +58,50 @@ class Post(models.Model):
     )
     image = models.ImageField(
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
+        # Поиск ссылок на файл перед его удалением (posts.images.release).
+        db_index=True,
         blank=True,
         verbose_name='Изображение',
         help_text='Добавьте изображение'
     )
+    # Заполняются после обработки загрузки (posts.images).
+    image_width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='ширина изображения'
+    )
+    image_height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='высота изображения'
+    )
+    image_blurhash = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name='заглушка изображения (BlurHash)'
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='число комментариев'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+        ]
         verbose_name_plural = 'посты'
 
     def __str__(self):
@@ -88,6 +131,12 @@ class Comment(models.Model):
     )
 
     class Meta():
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='comment_post_created_idx'
+            ),
+        ]
         verbose_name_plural = 'комментарии'
 
 
@@ -112,3 +161,94 @@ class Follow(models.Model):
                 fields=['user', 'author']
             )
         ]
+
+
+class TimelineEntry(models.Model):
+    """Запись ленты подписок, заранее разложенная по подписчикам."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='подписчик'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='пост'
+    )
+    pub_date = models.DateTimeField(verbose_name='дата публикации')
+
+    class Meta:
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-id'],
+                name='timeline_user_pub_date_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_timeline_entry',
+                fields=['user', 'post']
+            )
+        ]
+        verbose_name_plural = 'ленты подписок'
+
+
+class Profile(models.Model):
+    """Счётчики автора, которые иначе считались бы на каждый запрос."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='profile',
+        verbose_name='пользователь'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='число постов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        verbose_name='число подписчиков'
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='число подписок'
+    )
+
+    class Meta:
+        verbose_name_plural = 'профили'
+
+    def __str__(self):
+        return str(self.user)
+
+
+class SearchTerm(models.Model):
+    """Словопозиция запасного обратного индекса для поиска без FTS5."""
+    POST = 'post'
+    GROUP = 'group'
+    KINDS = ((POST, 'пост'), (GROUP, 'группа'))
+
+    term = models.CharField(max_length=64, verbose_name='основа слова')
+    kind = models.CharField(
+        max_length=5,
+        choices=KINDS,
+        verbose_name='тип документа'
+    )
+    object_id = models.PositiveIntegerField(verbose_name='id документа')
+    weight = models.FloatField(verbose_name='вес')
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['kind', 'term', 'object_id'],
+                name='search_kind_term_idx'
+            ),
+            models.Index(
+                fields=['kind', 'object_id'],
+                name='search_kind_object_idx'
+            ),
+        ]
+        verbose_name_plural = 'поисковый индекс'
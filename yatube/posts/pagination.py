@@ -0,0 +1,129 @@
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(direction, number, date, pk):
+    """Упаковывает позицию ленты в непрозрачный токен."""
+    raw = f'{direction}|{number}|{date.isoformat()}|{pk}'
+    return urlsafe_base64_encode(force_bytes(raw))
+
+
+def decode_cursor(token):
+    """Распаковывает токен; для битого токена возвращает None."""
+    try:
+        direction, number, date, pk = force_str(
+            urlsafe_base64_decode(token)
+        ).split('|')
+        cursor = (direction, int(number), parse_datetime(date), int(pk))
+    except (TypeError, ValueError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or cursor[2] is None:
+        return None
+    return cursor
+
+
+class CursorPaginator(Paginator):
+    """
+    Пагинация по ключу (date_field, id) без COUNT(*) и OFFSET.
+
+    Каждая страница выбирает per_page + 1 строку по индексу, поэтому
+    глубокие страницы стоят столько же, сколько первая. По умолчанию
+    новые записи идут первыми, descending=False листает от старых.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, date_field='pub_date',
+                 descending=True):
+        super().__init__(object_list, per_page)
+        self.date_field = date_field
+        self.descending = descending
+        self.number = 1
+        self.has_more = False
+        self.next_cursor = None
+        self.previous_cursor = None
+
+    @property
+    def num_pages(self):
+        return self.number + 1 if self.has_more else self.number
+
+    def get_page(self, token):
+        cursor = decode_cursor(token) if token else None
+        if cursor is None:
+            return self._page_after(None, 1)
+        direction, number, date, pk = cursor
+        if direction == PREVIOUS:
+            return self._page_before((date, pk), number)
+        return self._page_after((date, pk), number)
+
+    def _ordered(self, descending):
+        prefix = '-' if descending else ''
+        return self.object_list.order_by(
+            f'{prefix}{self.date_field}', f'{prefix}id'
+        )
+
+    def _seek(self, key, lookup):
+        date, pk = key
+        return (
+            Q(**{f'{self.date_field}__{lookup}': date})
+            | Q(**{self.date_field: date, f'id__{lookup}': pk})
+        )
+
+    def _page_after(self, key, number):
+        queryset = self._ordered(self.descending)
+        if key is not None:
+            queryset = queryset.filter(
+                self._seek(key, 'lt' if self.descending else 'gt')
+            )
+        rows = list(queryset[:self.per_page + 1])
+        self.has_more = len(rows) > self.per_page
+        return self._build_page(rows[:self.per_page], number)
+
+    def _page_before(self, key, number):
+        queryset = self._ordered(not self.descending).filter(
+            self._seek(key, 'gt' if self.descending else 'lt')
+        )
+        rows = list(queryset[:self.per_page + 1])
+        if len(rows) <= self.per_page:
+            number = 1
+        rows = rows[:self.per_page][::-1]
+        self.has_more = True
+        return self._build_page(rows, max(number, 1))
+
+    def _build_page(self, rows, number):
+        self.number = number
+        if rows and self.has_more:
+            self.next_cursor = self._token(NEXT, number + 1, rows[-1])
+        if rows and number > 1:
+            self.previous_cursor = self._token(PREVIOUS, number - 1, rows[0])
+        return Page(rows, number, self)
+
+    def _token(self, direction, number, row):
+        if isinstance(row, dict):
+            # Строки из .values() вместо экземпляров моделей.
+            return encode_cursor(
+                direction, number, row[self.date_field], row['id']
+            )
+        return encode_cursor(
+            direction, number, getattr(row, self.date_field), row.pk
+        )
+
+
+def get_feed_page(posts, request, per_page):
+    """
+    Страница ленты: по курсору, а со старым ?page=N — через OFFSET.
+
+    Страница выбирается сразу: её могут запрашивать из пула gather.
+    """
+    page_number = request.GET.get('page')
+    if page_number is None:
+        paginator = CursorPaginator(posts, per_page)
+        return paginator.get_page(request.GET.get('cursor'))
+    page_obj = Paginator(posts, per_page).get_page(page_number)
+    page_obj.object_list = list(page_obj.object_list)
+    return page_obj
@@ -0,0 +1,197 @@
+import re
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from .models import SearchTerm
+from .stemmer import stem
+
+WORD = re.compile(r'\w+')
+MAX_QUERY_TERMS = 10
+POST_TABLE = 'posts_post_fts'
+GROUP_TABLE = 'posts_group_fts'
+GROUP_TITLE_WEIGHT = 5.0
+
+_backend = None
+
+
+def search_terms(text, limit=None):
+    """Основы слов текста в порядке появления, без повторов."""
+    terms = list(dict.fromkeys(stem(word) for word in WORD.findall(text)))
+    return terms[:limit] if limit else terms
+
+
+def _stemmed(text):
+    return ' '.join(stem(word) for word in WORD.findall(text))
+
+
+class FtsResults:
+    """Ленивый ранжированный список id из таблицы FTS5 для Paginator."""
+
+    def __init__(self, table, terms):
+        self.table = table
+        self.match = ' '.join(f'"{term}"*' for term in terms)
+
+    def _fetch(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql.format(table=self.table), [self.match, *params]
+            )
+            return cursor.fetchall()
+
+    def count(self):
+        return self._fetch(
+            'SELECT count(*) FROM {table} WHERE {table} MATCH %s', []
+        )[0][0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        limit = -1 if index.stop is None else max(index.stop - start, 0)
+        rows = self._fetch(
+            'SELECT rowid FROM {table} WHERE {table} MATCH %s '
+            'ORDER BY rank LIMIT %s OFFSET %s',
+            [limit, start]
+        )
+        return [row[0] for row in rows]
+
+
+class Fts5Backend:
+    """Индекс во встроенных таблицах SQLite FTS5 с ранжированием bm25."""
+
+    def _replace(self, table, pk, **columns):
+        names = ', '.join(columns)
+        placeholders = ', '.join(['%s'] * (len(columns) + 1))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [pk])
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, {names}) '
+                f'VALUES ({placeholders})',
+                [pk, *columns.values()]
+            )
+
+    def index_post(self, post):
+        self._replace(POST_TABLE, post.pk, body=_stemmed(post.text))
+
+    def index_group(self, group):
+        self._replace(
+            GROUP_TABLE,
+            group.pk,
+            title=_stemmed(group.title),
+            description=_stemmed(group.description)
+        )
+
+    def remove(self, table, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [pk])
+
+    def remove_post(self, pk):
+        self.remove(POST_TABLE, pk)
+
+    def remove_group(self, pk):
+        self.remove(GROUP_TABLE, pk)
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {POST_TABLE}')
+            cursor.execute(f'DELETE FROM {GROUP_TABLE}')
+
+    def search_posts(self, terms):
+        return FtsResults(POST_TABLE, terms)
+
+    def search_groups(self, terms, limit):
+        return FtsResults(GROUP_TABLE, terms)[:limit]
+
+
+class InvertedIndexBackend:
+    """Запасной обратный индекс в обычной таблице для баз без FTS5."""
+
+    def _replace(self, kind, pk, weighted_texts):
+        SearchTerm.objects.filter(kind=kind, object_id=pk).delete()
+        weights = Counter()
+        for text, weight in weighted_texts:
+            terms = [stem(word) for word in WORD.findall(text)]
+            for term in terms:
+                weights[term[:64]] += weight / len(terms) ** 0.5
+        SearchTerm.objects.bulk_create(
+            SearchTerm(term=term, kind=kind, object_id=pk, weight=weight)
+            for term, weight in weights.items()
+        )
+
+    def index_post(self, post):
+        self._replace(SearchTerm.POST, post.pk, [(post.text, 1.0)])
+
+    def index_group(self, group):
+        self._replace(
+            SearchTerm.GROUP,
+            group.pk,
+            [(group.title, GROUP_TITLE_WEIGHT), (group.description, 1.0)]
+        )
+
+    def remove_post(self, pk):
+        SearchTerm.objects.filter(kind=SearchTerm.POST, object_id=pk).delete()
+
+    def remove_group(self, pk):
+        SearchTerm.objects.filter(
+            kind=SearchTerm.GROUP, object_id=pk
+        ).delete()
+
+    def clear(self):
+        SearchTerm.objects.all().delete()
+
+    def _search(self, kind, terms):
+        return (
+            SearchTerm.objects.filter(kind=kind, term__in=terms)
+            .values('object_id')
+            .annotate(matched=Count('term'), score=Sum('weight'))
+            .filter(matched=len(terms))
+            .order_by('-score', '-object_id')
+            .values_list('object_id', flat=True)
+        )
+
+    def search_posts(self, terms):
+        return self._search(SearchTerm.POST, terms)
+
+    def search_groups(self, terms, limit):
+        return list(self._search(SearchTerm.GROUP, terms)[:limit])
+
+
+def get_backend():
+    """FTS5, если миграция смогла создать его таблицы, иначе запасной."""
+    global _backend
+    if _backend is None:
+        tables = connection.introspection.table_names()
+        _backend = (
+            Fts5Backend() if POST_TABLE in tables else InvertedIndexBackend()
+        )
+    return _backend
+
+
+def rebuild(posts, groups, batch_size=1000):
+    """Перестраивает индекс пачками, не держа все строки в памяти."""
+    backend = get_backend()
+    backend.clear()
+    indexed = 0
+    for queryset, index in (
+        (posts, backend.index_post), (groups, backend.index_group)
+    ):
+        batch = []
+        for obj in queryset.iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) == batch_size:
+                indexed += _index_batch(batch, index)
+                batch = []
+        indexed += _index_batch(batch, index)
+    return indexed
+
+
+def _index_batch(batch, index):
+    with transaction.atomic():
+        for obj in batch:
+            index(obj)
+    return len(batch)
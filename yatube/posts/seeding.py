@@ -0,0 +1,168 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max, Min
+from django.utils import timezone
+from faker import Faker
+
+from .models import Comment, Follow, Group, Post, User
+
+TEXT_POOL_SIZE = 1000
+
+
+class Seeder:
+    """
+    Потоково генерирует синтетические данные через bulk_create.
+
+    Строки создаются генераторами и вставляются пачками, так что в памяти
+    держатся только id пользователей. Подписчики распределены по
+    степенному закону: чем меньше индекс автора, тем он популярнее.
+    """
+
+    def __init__(self, batch_size=5000, skew=3.0, days=365, seed=None):
+        self.batch_size = batch_size
+        self.skew = skew
+        self.rng = random.Random(seed)
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(seed)
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=days)
+        self.texts = [
+            self.faker.paragraph(nb_sentences=self.rng.randint(1, 6))
+            for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.sentences = [
+            self.faker.sentence() for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.user_ids = []
+        self.post_range = None
+
+    def _insert(self, model, objs):
+        inserted = 0
+        while True:
+            batch = list(islice(objs, self.batch_size))
+            if not batch:
+                return inserted
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+            inserted += len(batch)
+
+    def _skewed(self, size):
+        """Индекс из [0, size) с плотностью, убывающей по степенному закону."""
+        return int(size * self.rng.random() ** self.skew)
+
+    def _post_date(self, index, total):
+        return self.start + (self.now - self.start) * (index / total)
+
+    def users(self, count):
+        first = User.objects.aggregate(last=Max('pk'))['last'] or 0
+        password = make_password(None)
+        inserted = self._insert(User, (
+            User(
+                username=f'{self.faker.user_name()}_{first + number}',
+                first_name=self.faker.first_name(),
+                last_name=self.faker.last_name(),
+                password=password,
+            )
+            for number in range(1, count + 1)
+        ))
+        users = User.objects.filter(pk__gt=first) if inserted else User.objects
+        self.user_ids = list(
+            users.order_by('pk').values_list('pk', flat=True)
+        )
+        return inserted
+
+    def groups(self, count):
+        first = Group.objects.aggregate(last=Max('pk'))['last'] or 0
+        return self._insert(Group, (
+            Group(
+                title=self.faker.catch_phrase()[:200],
+                slug=f'group-{first + number}',
+                description=self.rng.choice(self.texts),
+            )
+            for number in range(1, count + 1)
+        ))
+
+    def posts(self, count):
+        if not self.user_ids:
+            return 0
+        first = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+        group_ids = list(Group.objects.values_list('pk', flat=True))
+        with _manual_dates(Post, 'pub_date'):
+            inserted = self._insert(Post, (
+                Post(
+                    author_id=self.user_ids[self._skewed(len(self.user_ids))],
+                    group_id=(
+                        self.rng.choice(group_ids)
+                        if group_ids and self.rng.random() < 0.7 else None
+                    ),
+                    text=self.rng.choice(self.texts),
+                    pub_date=self._post_date(index, count),
+                )
+                for index in range(count)
+            ))
+        self.post_range = Post.objects.filter(pk__gt=first).aggregate(
+            first=Min('pk'), last=Max('pk')
+        )
+        return inserted
+
+    def comments(self, count):
+        if not self.post_range or not self.user_ids:
+            return 0
+        first = self.post_range['first']
+        total = self.post_range['last'] - first + 1
+
+        def comment():
+            index = total - 1 - self._skewed(total)
+            post_date = self._post_date(index, total)
+            return Comment(
+                post_id=first + index,
+                author_id=self.rng.choice(self.user_ids),
+                text=self.rng.choice(self.sentences),
+                created=post_date + (self.now - post_date) * self.rng.random(),
+            )
+
+        with _manual_dates(Comment, 'created'):
+            return self._insert(Comment, (comment() for _ in range(count)))
+
+    def follows(self, count):
+        """Подписки без повторов: у каждого читателя свой набор авторов."""
+        users = len(self.user_ids)
+        if users < 2:
+            return 0
+        per_user, extra = divmod(count, users)
+
+        def authors(reader, wanted):
+            chosen = set()
+            attempts = 0
+            while len(chosen) < wanted and attempts < wanted * 10:
+                author = self.user_ids[self._skewed(users)]
+                if author != reader:
+                    chosen.add(author)
+                attempts += 1
+            while len(chosen) < wanted:
+                author = self.rng.choice(self.user_ids)
+                if author != reader:
+                    chosen.add(author)
+            return chosen
+
+        return self._insert(Follow, (
+            Follow(user_id=reader, author_id=author)
+            for number, reader in enumerate(self.user_ids)
+            for author in authors(
+                reader, min(per_user + (number < extra), users - 1)
+            )
+        ))
+
+
+@contextmanager
+def _manual_dates(model, name):
+    """Позволяет bulk_create сохранить заданную дату вместо текущей."""
+    field = model._meta.get_field(name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
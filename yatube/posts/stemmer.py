@@ -0,0 +1,67 @@
+"""Стеммер Snowball для русского языка."""
+import re
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = re.compile(
+    r'((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$'
+)
+REFLEXIVE = re.compile(r'(с[яь])$')
+ADJECTIVE = re.compile(
+    r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|'
+    r'ую|юю|ая|яя|ою|ею)$'
+)
+PARTICIPLE = re.compile(r'((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+VERB = re.compile(
+    r'((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|'
+    r'ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)|'
+    r'((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$'
+)
+NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|'
+    r'ем|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+SUPERLATIVE = re.compile(r'(ейше|ейш)$')
+DERIVATIONAL = re.compile(r'(ость|ост)$')
+RV = re.compile(rf'^(.*?[{VOWELS}])(.*)$')
+REGION = re.compile(rf'[{VOWELS}][^{VOWELS}]')
+
+
+def _region(word, start=0):
+    match = REGION.search(word, start)
+    return match.end() if match else len(word)
+
+
+def stem(word):
+    """Возвращает основу слова; не кириллические слова только понижает."""
+    word = word.lower().replace('ё', 'е')
+    match = RV.match(word)
+    if match is None or not re.search(r'[а-я]', word):
+        return word
+    head, rv = match.groups()
+
+    rv, found = PERFECTIVE_GERUND.subn('', rv)
+    if not found:
+        rv = REFLEXIVE.sub('', rv)
+        rv, found = ADJECTIVE.subn('', rv)
+        if found:
+            rv = PARTICIPLE.sub('', rv)
+        else:
+            rv, found = VERB.subn('', rv)
+            if not found:
+                rv = NOUN.sub('', rv)
+
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    r2 = _region(word, _region(word))
+    derivational = DERIVATIONAL.search(rv)
+    if derivational and len(head) + derivational.start() >= r2:
+        rv = rv[:derivational.start()]
+
+    rv, found = SUPERLATIVE.subn('', rv)
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    elif not found and rv.endswith('ь'):
+        rv = rv[:-1]
+    return head + rv
@@ -0,0 +1,15 @@
+from django import template
+
+from ..caching import render_post_cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """HTML карточек страницы из кеша фрагментов, одним запросом к кешу."""
+    if not posts:
+        return []
+    return render_post_cards(
+        posts, context.get('request'), context.get('group')
+    )
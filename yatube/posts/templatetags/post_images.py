@@ -0,0 +1,24 @@
+from django import template
+
+from ..images import schedule_processing
+from ..thumbnails import card_image as build_card_image
+from ..thumbnails import schedule, unprocessed
+
+register = template.Library()
+
+
+@register.simple_tag
+def card_image(image):
+    """
+    Варианты карточки для <picture> (CardImage) или None, пока они
+    строятся в фоне.
+    """
+    if not image:
+        return None
+    card = build_card_image(image)
+    if card is None and unprocessed(image):
+        # Превью построит обработка загрузки.
+        schedule_processing(image)
+    elif card is None:
+        schedule(image)
+    return card
@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from ..models import Comment, Follow, Post, Profile
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def profile(self, user):
+        return Profile.objects.get(user=user)
+
+    def test_profile_created_with_user(self):
+        """Профиль со счётчиками создаётся вместе с пользователем."""
+        self.assertEqual(self.profile(self.author).posts_count, 0)
+
+    def test_post_counter(self):
+        """Счётчик постов автора меняется при создании и удалении поста."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        self.assertEqual(self.profile(self.author).posts_count, 1)
+        post.delete()
+        self.assertEqual(self.profile(self.author).posts_count, 0)
+
+    def test_comment_counter(self):
+        """Счётчик комментариев поста меняется вместе с комментариями."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий'
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_follow_counters(self):
+        """Подписка меняет счётчики подписчиков и подписок."""
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.profile(self.author).followers_count, 1)
+        self.assertEqual(self.profile(self.reader).following_count, 1)
+        follow.delete()
+        self.assertEqual(self.profile(self.author).followers_count, 0)
+        self.assertEqual(self.profile(self.reader).following_count, 0)
+
+    def test_recount_command_fixes_drift(self):
+        """Команда recount_counters восстанавливает точные значения."""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пост {i}') for i in range(3)
+        )
+        Profile.objects.filter(user=self.reader).delete()
+        call_command('recount_counters', stdout=StringIO())
+        self.assertEqual(self.profile(self.author).posts_count, 3)
+        self.assertTrue(Profile.objects.filter(user=self.reader).exists())
+
+
+class UserDeletionTests(TransactionTestCase):
+    def test_delete_user_with_posts_and_follows(self):
+        """Каскад не воссоздаёт профиль удаляемого пользователя."""
+        author = User.objects.create_user(username='author')
+        reader = User.objects.create_user(username='reader')
+        post = Post.objects.create(author=author, text='Пост')
+        Comment.objects.create(post=post, author=reader, text='Комментарий')
+        Follow.objects.create(user=reader, author=author)
+        Follow.objects.create(user=author, author=reader)
+        author.delete()
+        self.assertFalse(Profile.objects.filter(user_id=author.pk).exists())
+        profile = Profile.objects.get(user=reader)
+        self.assertEqual(profile.followers_count, 0)
+        self.assertEqual(profile.following_count, 0)
@@ -0,0 +1,128 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {i}'
+            )
+            for i in range(5)
+        ]
+        Post.objects.create(author=cls.reader, text='Чужой пост')
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.author, text='Свой комментарий'
+        )
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Чужой комментарий'
+        )
+        Follow.objects.create(user=cls.author, author=cls.reader)
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def export(self, **params):
+        return self.author_client.get(reverse('posts:data_export'), params)
+
+    def lines(self, response):
+        self.assertTrue(response.streaming)
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        return chunks, ''.join(chunks).splitlines()
+
+    def test_ndjson_contains_only_own_data(self):
+        """NDJSON: по строке на запись, только данные самого пользователя."""
+        response = self.export()
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="yatube-author.ndjson"'
+        )
+        chunks, lines = self.lines(response)
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [record['type'] for record in records],
+            ['profile'] + ['post'] * 5 + ['comment', 'follow']
+        )
+        self.assertEqual(records[0]['username'], 'author')
+        self.assertEqual(records[1]['text'], 'Пост 0')
+        self.assertEqual(records[1]['group'], 'group')
+        self.assertEqual(records[6]['text'], 'Свой комментарий')
+        self.assertEqual(records[7], {'type': 'follow', 'author': 'reader'})
+        # Куски по EXPORT_CHUNK_SIZE строк.
+        self.assertEqual(len(chunks), 4)
+
+    def test_csv_exports_one_table(self):
+        response = self.export(format='csv', kind='post')
+        self.assertEqual(
+            response['Content-Type'], 'text/csv; charset=utf-8'
+        )
+        _, lines = self.lines(response)
+        rows = list(csv.reader(lines))
+        self.assertEqual(rows[0], list(
+            ('id', 'text', 'pub_date', 'updated_at', 'group', 'image')
+        ))
+        self.assertEqual(
+            [row[1] for row in rows[1:]], [f'Пост {i}' for i in range(5)]
+        )
+
+    def test_bad_parameters(self):
+        for params in (
+            {'format': 'xml'}, {'kind': 'password'}, {'format': 'csv'}
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.export(**params).status_code, HTTPStatus.BAD_REQUEST
+                )
+
+    def test_anonymous_redirected_to_login(self):
+        response = self.client.get(reverse('posts:data_export'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_command_dumps_all_tables(self):
+        out = StringIO()
+        call_command('export_yatube', stdout=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        counts = {}
+        for record in records:
+            counts[record['type']] = counts.get(record['type'], 0) + 1
+        self.assertEqual(counts, {'post': 6, 'comment': 2, 'follow': 1})
+        self.assertEqual(records[0]['author_id'], self.author.id)
+
+    def test_command_exports_user_table_as_csv(self):
+        out = StringIO()
+        call_command(
+            'export_yatube', user='reader', format='csv', kind=['comment'],
+            stdout=out
+        )
+        rows = list(csv.reader(out.getvalue().splitlines()))
+        self.assertEqual(rows[0], ['id', 'post_id', 'text', 'created'])
+        self.assertEqual(rows[1][2], 'Чужой комментарий')
+        self.assertEqual(len(rows), 2)
+
+    def test_command_rejects_bad_arguments(self):
+        for options in (
+            {'format': 'csv'}, {'kind': ['profile']}, {'user': 'nobody'}
+        ):
+            with self.subTest(options=options):
+                with self.assertRaises(CommandError):
+                    call_command('export_yatube', stdout=StringIO(), **options)
@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import tempfile
 
@@ -75,10 +76,12 @@ class PostCreateFormTests(TestCase):
             response,
             reverse('posts:profile', kwargs={'username': self.user.username})
         )
+        # Имя файла — хеш содержимого (core.storage).
+        digest = hashlib.sha256(self.small_gif).hexdigest()
         self.assertTrue(
             Post.objects.filter(
                 text='Проверка на создание поста',
-                image='posts/small.gif'
+                image=f'posts/{digest[:2]}/{digest[2:4]}/{digest}.gif'
             ).exists()
         )
 
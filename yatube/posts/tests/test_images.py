@@ -0,0 +1,206 @@
+import hashlib
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.storage import content_name
+
+from .. import blurhash
+from ..forms import PostForm
+from ..images import encode, process, release, restore, storage
+from ..models import Post
+from ..thumbnails import card_image, generate
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+ORIENTATION = 0x0112
+
+
+def jpeg(size, orientation=None):
+    image = Image.new('RGB', size, (200, 30, 30))
+    exif = Image.Exif()
+    exif[0x010F] = 'Камера'
+    if orientation:
+        exif[ORIENTATION] = orientation
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', exif=exif.tobytes())
+    return SimpleUploadedFile(
+        'photo.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+def upload(user, **kwargs):
+    return Post.objects.create(author=user, text='Пост', image=jpeg(**kwargs))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, IMAGE_MAX_SIZE=(200, 200))
+class ImageProcessingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, **kwargs):
+        return upload(self.user, **kwargs)
+
+    def test_upload_is_downsized_and_reencoded(self):
+        """Оригинал поворачивается по EXIF, уменьшается и теряет EXIF."""
+        post = self.upload(size=(800, 400), orientation=6)
+        original = post.image.name
+        self.assertTrue(process(original))
+        post.refresh_from_db()
+        self.assertTrue(post.image.name.endswith('.webp'))
+        self.assertFalse(storage.exists(original))
+        self.assertEqual((post.image_width, post.image_height), (100, 200))
+        self.assertEqual(len(post.image_blurhash), 28)
+        with storage.open(post.image.name) as file:
+            image = Image.open(file)
+            self.assertEqual(image.format, 'WEBP')
+            self.assertEqual(image.size, (100, 200))
+            self.assertFalse(image.getexif())
+        self.assertIsNotNone(card_image(post.image))
+
+    @override_settings(IMAGE_FORMAT='JPEG')
+    def test_jpeg_is_progressive(self):
+        post = self.upload(size=(300, 300))
+        self.assertTrue(process(post.image.name))
+        post.refresh_from_db()
+        with storage.open(post.image.name) as file:
+            image = Image.open(file)
+            self.assertTrue(image.info.get('progressive'))
+            self.assertFalse(image.getexif())
+
+    def test_replaced_image_is_discarded(self):
+        """Если картинку успели сменить, результат не сохраняется."""
+        post = self.upload(size=(300, 300))
+        original = post.image.name
+        Post.objects.filter(id=post.id).update(image='')
+        self.assertFalse(process(original))
+        self.assertTrue(storage.exists(original))
+        with storage.open(original) as source:
+            content = encode(source)[0]
+        self.assertFalse(storage.exists(content_name(
+            'posts', hashlib.sha256(content).hexdigest(), '.webp'
+        )))
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=100)
+    def test_form_rejects_large_upload(self):
+        form = PostForm(
+            {'text': 'Пост'}, files={'image': jpeg(size=(300, 300))}
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    def test_blurhash_matches_reference(self):
+        """Значение совпадает с эталонной реализацией woltapp/blurhash."""
+        image = Image.effect_mandelbrot(
+            (32, 32), (-2, -1.5, 1, 1.5), 50
+        ).convert('RGB')
+        self.assertEqual(
+            blurhash.encode(image), 'L142M3t79FM{t7j[ayay00M{t7%M'
+        )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageReleaseTests(TransactionTestCase):
+    """Без обёртки TestCase: файлы освобождаются в on_commit."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='author')
+
+    def test_identical_uploads_share_file_until_last_post_deleted(self):
+        """Одинаковые загрузки — один файл; удаляется он с последним постом."""
+        first = upload(self.user, size=(300, 200))
+        second = upload(self.user, size=(300, 200))
+        name = first.image.name
+        self.assertEqual(second.image.name, name)
+        self.assertRegex(name, r'^posts/\w\w/\w\w/\w{64}\.jpg$')
+        generate(name)
+        # Превью показываются для обработанных загрузок.
+        first.image_width, first.image_height = 300, 200
+        thumbnail = card_image(first.image).src[len(settings.MEDIA_URL):]
+        first.delete()
+        self.assertTrue(storage.exists(name))
+        second.delete()
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(storage.exists(thumbnail))
+
+    def test_release_keeps_file_reused_by_concurrent_upload(self):
+        """Ссылка, появившаяся во время удаления, возвращает файл."""
+        post = upload(self.user, size=(300, 200))
+        name = post.image.name
+        Post.objects.filter(id=post.id).update(image='')
+        detach = storage.detach
+
+        def reuse(name):
+            detached = detach(name)
+            Post.objects.filter(id=post.id).update(image=name)
+            return detached
+
+        with mock.patch.object(storage, 'detach', reuse):
+            self.assertFalse(release(name))
+        self.assertTrue(storage.exists(name))
+
+    def test_upload_restores_file_released_before_save(self):
+        """Загрузка записывает файл заново, если его успели удалить."""
+        content = jpeg(size=(300, 200))
+        post = upload(self.user, size=(300, 200))
+        name = post.image.name
+        storage.delete(name)
+        restore(name, content)
+        self.assertTrue(storage.exists(name))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class UploadProcessingTests(TransactionTestCase):
+    """Загрузка через сайт и API доходит до обработки после сохранения."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='author')
+        self.client.force_login(self.user)
+
+    def assertProcessed(self, post):
+        self.assertRegex(post.image.name, r'^posts/\w\w/\w\w/\w{64}\.webp$')
+        self.assertEqual((post.image_width, post.image_height), (300, 200))
+        self.assertTrue(post.image_blurhash)
+        with storage.open(post.image.name) as file:
+            image = Image.open(file)
+            self.assertEqual(image.format, 'WEBP')
+            self.assertFalse(image.getexif())
+
+    def test_post_create_processes_upload(self):
+        self.client.post(reverse('posts:post_create'), {
+            'text': 'Пост', 'image': jpeg(size=(300, 200))
+        })
+        self.assertProcessed(Post.objects.get())
+
+    def test_api_processes_upload(self):
+        response = self.client.post(reverse('api:posts'), {
+            'text': 'Пост', 'image': jpeg(size=(300, 200))
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertProcessed(Post.objects.get())
@@ -0,0 +1,96 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+# Полный проход по таблице без индекса или сортировка во временном B-дереве.
+BAD_PLAN = re.compile(r'\bSCAN (TABLE )?\w+$|TEMP B-TREE')
+
+
+@override_settings(MAX_POSTS=3, MAX_COMMENTS=3)
+class FeedQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(8):
+            post = Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {number}'
+            )
+        for number in range(8):
+            Comment.objects.create(
+                post=post, author=cls.reader, text=f'Комментарий {number}'
+            )
+        cls.post = post
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def plans(self, url):
+        """Планы всех SELECT, которые выполнил запрос к url."""
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                yield sql, [row[-1] for row in cursor.fetchall()]
+
+    def next_url(self, url):
+        response = self.client.get(url)
+        page_obj = response.context.get('comments') or response.context[
+            'page_obj'
+        ]
+        return f'{url}?cursor={page_obj.paginator.next_cursor}'
+
+    def assertIndexed(self, url):
+        for sql, plan in self.plans(url):
+            with self.subTest(url=url, sql=sql):
+                self.assertFalse(
+                    [step for step in plan if BAD_PLAN.search(step)], plan
+                )
+
+    def test_feeds_use_indexes(self):
+        """Ни одна лента не читает таблицу целиком и не сортирует в памяти."""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:follow_index'),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ]
+        urls += [self.next_url(url) for url in urls]
+        api_urls = [
+            reverse('api:posts'),
+            reverse('api:group_posts', args=[self.group.slug]),
+            reverse('api:profile_posts', args=[self.author.username]),
+            reverse('api:follow_feed'),
+        ]
+        urls += api_urls + [
+            self.client.get(url).json()['next'] for url in api_urls
+        ]
+        urls.append(reverse('posts:post_comments', args=[self.post.pk]))
+        for url in urls:
+            self.assertIndexed(url)
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_celebrity_pull_uses_indexes(self):
+        """Подтягивание постов популярных авторов тоже идёт по индексам."""
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.reader, author=other)
+        Post.objects.create(author=other, text='Пост другого автора')
+        self.assertIndexed(reverse('posts:follow_index'))
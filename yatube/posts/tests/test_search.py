@@ -0,0 +1,139 @@
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, SearchTerm
+from ..search import InvertedIndexBackend, get_backend, search_terms
+from ..stemmer import stem
+
+User = get_user_model()
+
+
+def fill_index_by_migration():
+    migration = import_module('posts.migrations.0014_search_index')
+    apps = MigrationExecutor(connection).loader.project_state(
+        ('posts', '0014_search_index')
+    ).apps
+    migration.fill_search_index(apps, SimpleNamespace(connection=connection))
+
+
+class StemmerTests(TestCase):
+    def test_russian_word_forms_share_stem(self):
+        """Словоформы приводятся к общей основе."""
+        cases = {
+            'путешествие': 'путешеств',
+            'путешествиями': 'путешеств',
+            'красивая': 'красив',
+            'известность': 'известн',
+            'ёжики': 'ежик',
+        }
+        for word, expected in cases.items():
+            with self.subTest(word=word):
+                self.assertEqual(stem(word), expected)
+
+
+class SearchViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Путешествия',
+            slug='travel',
+            description='Заметки о дальних странах',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Рассказ о путешествии на север'
+        )
+        Post.objects.create(author=cls.user, text='Совсем другая тема')
+
+    def search(self, query):
+        return self.client.get(reverse('posts:search'), {'q': query})
+
+    def test_search_finds_inflected_forms(self):
+        """Поиск находит пост и группу по другой словоформе."""
+        response = self.search('путешествиями')
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        self.assertEqual(response.context['groups'], [self.group])
+
+    def test_search_requires_all_terms(self):
+        """Все слова запроса должны встретиться в посте."""
+        response = self.search('путешествие тема')
+        self.assertEqual(list(response.context['page_obj']), [])
+
+    def test_edit_and_delete_update_index(self):
+        """Правка и удаление поста сразу видны в поиске."""
+        post = Post.objects.create(author=self.user, text='Рассказ о лесе')
+        post.text = 'Рассказ о рыбалке'
+        post.save()
+        response = self.search('рыбалка')
+        self.assertEqual(list(response.context['page_obj']), [post])
+        post.delete()
+        response = self.search('рыбалка')
+        self.assertEqual(list(response.context['page_obj']), [])
+
+    def test_empty_query_renders_form(self):
+        """Пустой запрос показывает только форму."""
+        response = self.search('')
+        self.assertNotIn('page_obj', response.context)
+
+    def test_migration_indexes_existing_posts(self):
+        """Миграция поиска заполняет индекс уже написанными постами."""
+        get_backend().clear()
+        response = self.search('путешествие')
+        self.assertEqual(list(response.context['page_obj']), [])
+        fill_index_by_migration()
+        response = self.search('путешествие')
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        self.assertEqual(response.context['groups'], [self.group])
+
+
+class InvertedIndexBackendTests(TestCase):
+    def test_ranked_search_without_fts(self):
+        """Запасной индекс ранжирует посты по весу совпадений."""
+        user = User.objects.create_user(username='author')
+        backend = InvertedIndexBackend()
+        short = Post.objects.create(author=user, text='Кошки')
+        long = Post.objects.create(
+            author=user, text='Кошки любят гулять по крышам ночью'
+        )
+        for post in (short, long):
+            backend.index_post(post)
+        self.assertEqual(
+            list(backend.search_posts(search_terms('кошка'))),
+            [short.pk, long.pk]
+        )
+        backend.remove_post(short.pk)
+        self.assertEqual(
+            list(backend.search_posts(search_terms('кошки'))), [long.pk]
+        )
+
+    def test_migration_fills_index_without_fts(self):
+        """Без FTS5 миграция пишет те же строки, что и запасной индекс."""
+        user = User.objects.create_user(username='author')
+        post = Post.objects.create(author=user, text='Кошки гуляют по крышам')
+        group = Group.objects.create(
+            title='Кошки', slug='cats', description='Про кошек'
+        )
+        rows = SearchTerm.objects.values_list(
+            'term', 'kind', 'object_id', 'weight'
+        ).order_by('kind', 'term')
+        with mock.patch.object(
+            connection.introspection, 'table_names', return_value=[]
+        ):
+            fill_index_by_migration()
+        migrated = list(rows)
+        SearchTerm.objects.all().delete()
+        backend = InvertedIndexBackend()
+        backend.index_post(post)
+        backend.index_group(group)
+        self.assertTrue(migrated)
+        self.assertEqual(migrated, list(rows))
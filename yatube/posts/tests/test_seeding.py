@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import TestCase
+
+from ..models import Comment, Follow, Group, Post, Profile, TimelineEntry
+
+
+class SeedCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def seed(self, **options):
+        call_command(
+            'seed_yatube',
+            users=40,
+            groups=3,
+            posts=300,
+            comments=500,
+            follows=400,
+            batch_size=64,
+            seed=1,
+            stdout=StringIO(),
+            **options
+        )
+
+    def test_creates_requested_rows(self):
+        """Команда создаёт ровно запрошенное число строк каждой модели."""
+        self.seed(skip_derived=True)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 500)
+        self.assertEqual(Follow.objects.count(), 400)
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_followers_follow_power_law(self):
+        """Самый популярный автор собирает много больше подписчиков."""
+        self.seed(skip_derived=True)
+        counts = sorted(
+            Follow.objects.values('author').annotate(
+                total=Count('pk')
+            ).values_list('total', flat=True),
+            reverse=True
+        )
+        self.assertGreater(counts[0], 4 * counts[len(counts) // 2])
+        self.assertFalse(
+            Follow.objects.filter(user_id=F('author_id')).exists()
+        )
+
+    def test_derived_data_is_rebuilt(self):
+        """Счётчики и ленты пересчитываются после загрузки."""
+        self.seed()
+        follow = Follow.objects.filter(author__posts__isnull=False).first()
+        profile = Profile.objects.get(user_id=follow.author_id)
+        self.assertEqual(
+            profile.followers_count,
+            Follow.objects.filter(author_id=follow.author_id).count()
+        )
+        latest = Post.objects.filter(author_id=follow.author_id).first()
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user_id=follow.user_id, post=latest
+            ).exists()
+        )
@@ -0,0 +1,143 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from sorl.thumbnail import default
+
+from ..models import Group, Post
+from ..thumbnails import CARD_WIDTHS, card_image, generate
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                name='small.gif', content=small_gif, content_type='image/gif'
+            ),
+            # Как после обработки загрузки (posts.images).
+            image_width=2,
+            image_height=1
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_card_falls_back_to_original_while_pending(self):
+        """Пока превью не готово, карточка показывает оригинал."""
+        self.assertIsNone(card_image(self.post.image))
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, self.post.image.url)
+
+    def test_card_uses_pregenerated_thumbnail(self):
+        """Готовое превью берётся из хранилища sorl без генерации."""
+        self.assertTrue(generate(self.post.image.name))
+        card = card_image(self.post.image)
+        self.assertIsNotNone(card)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, card.src)
+        self.assertContains(response, card.srcset)
+        self.assertNotContains(response, self.post.image.url + '"')
+
+    def test_ready_thumbnails_change_etag(self):
+        """Страницы, показавшие оригинал, не получают 304 после превью."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.id]),
+        )
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        self.assertTrue(generate(self.post.image.name))
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, '<picture>')
+
+    def test_card_lookup_does_not_query_database(self):
+        """Готовность превью читается из кеша kvstore, не из базы."""
+        self.assertTrue(generate(self.post.image.name))
+        unprocessed = Post(image=self.post.image.name)
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.assertIsNone(card_image(self.post.image))
+            self.assertIsNone(card_image(unprocessed.image))
+        # Задача генерации находит превью в базе и возвращает его в кеш.
+        self.assertTrue(generate(self.post.image.name))
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(card_image(self.post.image))
+
+    def test_pages_with_pending_cards_keep_query_budget(self):
+        """Карточки, чьи превью ещё строятся, не выходят за бюджет."""
+        group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.filter(id=self.post.id).update(group=group)
+        Post.objects.create(
+            author=self.user,
+            text='Необработанная загрузка',
+            group=group,
+            image=self.post.image.name
+        )
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.id]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with self.assertNoLogs('core.middleware', 'WARNING'):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_variants_built_from_one_decode(self):
+        """Все ширины и форматы строятся за одно декодирование исходника."""
+        buffer = BytesIO()
+        Image.new('RGB', (2500, 1000), 'teal').save(buffer, 'JPEG')
+        post = Post.objects.create(
+            author=self.user,
+            text='Пост с фотографией',
+            image=SimpleUploadedFile('photo.jpg', buffer.getvalue()),
+            image_width=2500,
+            image_height=1000
+        )
+        with mock.patch.object(
+            default.engine, 'get_image', wraps=default.engine.get_image
+        ) as get_image:
+            self.assertTrue(generate(post.image.name))
+            self.assertTrue(generate(post.image.name))
+        self.assertEqual(get_image.call_count, 1)
+        card = card_image(post.image)
+        self.assertEqual(card.srcset.count('w, ') + 1, len(CARD_WIDTHS))
+        self.assertEqual(card.sources[0][0], 'image/webp')
+        for url in card.srcset.split(', ') + card.sources[0][1].split(', '):
+            name = url.split()[0][len(settings.MEDIA_URL):]
+            self.assertTrue(default.storage.exists(name), name)
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import views
+from ..models import Follow, Post, TimelineEntry
+from ..timeline import pull_celebrity_posts
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def feed(self):
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Новый пост автора попадает в ленту подписчика."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.feed(), [post])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Подписка заполняет ленту старыми постами, отписка очищает."""
+        post = Post.objects.create(author=self.author, text='Старый пост')
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        self.assertEqual(self.feed(), [post])
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', args=[self.author.username])
+        )
+        self.assertEqual(self.feed(), [])
+        self.assertFalse(self.reader.timeline.exists())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_celebrity_posts_are_pulled_on_read(self):
+        """Посты популярного автора подтягиваются при чтении ленты."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        cache.clear()
+        post = Post.objects.create(author=self.author, text='Пост звезды')
+        self.assertFalse(self.reader.timeline.filter(post=post).exists())
+        # Запросы по авторам и запись подтянутых расширяют бюджет.
+        with self.assertNoLogs('core.middleware', 'WARNING'):
+            self.assertEqual(self.feed(), [post])
+            self.assertEqual(self.feed(), [post])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_repeat_pull_without_new_posts_does_not_write(self):
+        """Повторное чтение без новых постов не открывает запись."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        cache.clear()
+        Post.objects.create(author=self.author, text='Пост звезды')
+        self.assertTrue(pull_celebrity_posts(self.reader))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(pull_celebrity_posts(self.reader))
+        self.assertEqual(
+            [query['sql'] for query in queries
+             if not query['sql'].startswith('SELECT')],
+            []
+        )
+        Post.objects.create(author=self.author, text='Ещё пост')
+        self.assertTrue(pull_celebrity_posts(self.reader))
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_repeat_feed_read_uses_replica(self):
+        """В default лента читается, только если в неё что-то добавилось."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        cache.clear()
+        post = Post.objects.create(author=self.author, text='Пост звезды')
+        with mock.patch.object(
+            views, 'paginator', wraps=views.paginator
+        ) as paginator:
+            self.assertEqual(self.feed(), [post])
+            self.assertEqual(self.feed(), [post])
+        first, repeat = (call[0][0] for call in paginator.call_args_list)
+        self.assertEqual(first.db, DEFAULT_DB_ALIAS)
+        # Без явной базы выбирает роутер — реплику в replica_reads.
+        self.assertIsNone(repeat._db)
@@ -1,10 +1,19 @@
+from http import HTTPStatus
+from unittest import mock
+
 from django import forms
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.shortcuts import get_object_or_404
-from django.test import Client, TestCase
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings
+)
 from django.urls import reverse
+from django.utils import timezone
+
+from core.testing import QueryBudgetMixin
 
 from ..models import Follow, Group, Post
 
@@ -234,3 +243,329 @@ class PaginatorViewsTest(TestCase):
         """На второй странице отображены оставшиеся страницы."""
         response = self.client.get(reverse('posts:index') + '?page=2')
         self.assertEqual(len(response.context['page_obj']), 1)
+
+    def test_cursor_pages_follow_each_other(self):
+        """Курсорная пагинация листает вперёд и назад без пропусков."""
+        first = self.client.get(reverse('posts:index'))
+        next_cursor = first.context['page_obj'].paginator.next_cursor
+        second = self.client.get(
+            reverse('posts:index') + f'?cursor={next_cursor}'
+        )
+        self.assertEqual(len(second.context['page_obj']), 1)
+        self.assertEqual(second.context['page_obj'].number, 2)
+        self.assertFalse(second.context['page_obj'].has_next())
+        previous_cursor = second.context['page_obj'].paginator.previous_cursor
+        back = self.client.get(
+            reverse('posts:index') + f'?cursor={previous_cursor}'
+        )
+        self.assertEqual(
+            list(back.context['page_obj']), list(first.context['page_obj'])
+        )
+        self.assertEqual(back.context['page_obj'].number, 1)
+
+    def test_cursor_page_does_not_count_posts(self):
+        """Курсорная страница не выполняет COUNT(*)."""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 10)
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        """Испорченный курсор отдаёт первую страницу."""
+        response = self.client.get(reverse('posts:index') + '?cursor=xyz')
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+
+class IndexCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.user, text='Первый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def test_anonymous_index_is_served_from_cache(self):
+        """Повторная анонимная главная не обращается к базе."""
+        first = self.client.get(reverse('posts:index'))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('posts:index'))
+        self.assertEqual(first.content, second.content)
+
+    def test_authenticated_index_reuses_cached_page(self):
+        """Авторизованный вариант кеширует посты страницы."""
+        self.author_client.get(reverse('posts:index'))
+        response = self.author_client.get(reverse('posts:index'))
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        self.assertNotContains(
+            self.client.get(reverse('posts:index')), 'Пользователь: author'
+        )
+
+    def test_new_post_and_comment_invalidate_cache(self):
+        """Новый пост или комментарий сбрасывает кеш главной."""
+        self.client.get(reverse('posts:index'))
+        Post.objects.create(author=self.user, text='Свежий пост')
+        self.assertContains(
+            self.client.get(reverse('posts:index')), 'Свежий пост'
+        )
+        self.post.comments.create(author=self.user, text='Комментарий')
+        with self.assertNumQueries(1):
+            self.client.get(reverse('posts:index'))
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.user, text='Старый текст')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def profile_page(self):
+        return self.client.get(
+            reverse('posts:profile', args=[self.user.username])
+        ).content.decode()
+
+    def test_cards_are_fetched_with_one_get_many(self):
+        """Повторная страница берёт карточки из кеша одним get_many."""
+        self.profile_page()
+        with mock.patch(
+            'posts.caching.render_to_string'
+        ) as render, mock.patch(
+            'posts.caching.cache.get_many', wraps=cache.get_many
+        ) as get_many:
+            self.assertIn('Старый текст', self.profile_page())
+        render.assert_not_called()
+        get_many.assert_called_once()
+
+    def test_post_edit_refreshes_card(self):
+        """Правка поста сразу видна в карточке."""
+        self.profile_page()
+        self.author_client.post(
+            reverse('posts:post_edit', args=[self.post.id]),
+            {'text': 'Новый текст'}
+        )
+        self.assertIn('Новый текст', self.profile_page())
+
+    def test_author_name_change_refreshes_card(self):
+        """Смена имени автора сразу видна в карточке."""
+        self.profile_page()
+        User.objects.filter(pk=self.user.pk).update(first_name='Лев')
+        self.assertIn('Лев', self.profile_page())
+
+
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        cls.comments = [
+            cls.post.comments.create(author=cls.user, text=f'Комментарий {i}')
+            for i in range(settings.MAX_COMMENTS + 5)
+        ]
+
+    def test_post_detail_shows_first_comments_page(self):
+        """На странице поста только первая страница комментариев."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        )
+        comments = response.context['comments']
+        self.assertEqual(
+            list(comments), self.comments[:settings.MAX_COMMENTS]
+        )
+        self.assertTrue(comments.has_next())
+
+    def test_fragment_endpoint_returns_next_comments(self):
+        """JSON-фрагмент отдаёт следующие комментарии и ссылку дальше."""
+        first = self.client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        ).context['comments']
+        response = self.client.get(
+            reverse('posts:post_comments', args=[self.post.id]),
+            {'cursor': first.paginator.next_cursor}
+        )
+        data = response.json()
+        self.assertIn('Комментарий 24', data['html'])
+        self.assertNotIn('Комментарий 19<', data['html'])
+        self.assertIsNone(data['next'])
+
+    def test_fragment_endpoint_for_missing_post(self):
+        """Для несуществующего поста фрагмент отвечает 404."""
+        response = self.client.get(reverse('posts:post_comments', args=[0]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовое название',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Тестовый пост'
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[cls.group.slug]),
+            reverse('posts:profile', args=[cls.user.username]),
+            reverse('posts:post_detail', args=[cls.post.id]),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def revalidate(self, client, url):
+        etag = client.get(url)['ETag']
+        return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_repeat_visit_gets_not_modified(self):
+        """Повторный запрос с ETag получает 304 без рендеринга."""
+        for url in self.urls:
+            for client in (self.client, self.reader_client):
+                with self.subTest(url=url):
+                    response = self.revalidate(client, url)
+                    self.assertEqual(
+                        response.status_code, HTTPStatus.NOT_MODIFIED
+                    )
+                    self.assertEqual(response.templates, [])
+
+    def test_changes_invalidate_etag(self):
+        """Правка, комментарий, подписка и смена имени меняют ETag."""
+        group, profile, detail = self.urls[1:]
+        changes = (
+            (
+                lambda: Post.objects.filter(pk=self.post.pk).update(
+                    text='Правка', updated_at=timezone.now()
+                ),
+                (group, profile, detail)
+            ),
+            (
+                lambda: self.post.comments.create(
+                    author=self.reader, text='Комментарий'
+                ),
+                (group, profile, detail)
+            ),
+            (
+                lambda: Follow.objects.create(
+                    user=self.reader, author=self.user
+                ),
+                (profile,)
+            ),
+            (
+                lambda: User.objects.get(pk=self.user.pk).save(),
+                self.urls
+            ),
+        )
+        for change, urls in changes:
+            etags = [self.reader_client.get(url)['ETag'] for url in urls]
+            change()
+            for url, etag in zip(urls, etags):
+                with self.subTest(url=url):
+                    response = self.reader_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag
+                    )
+                    self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_viewer(self):
+        url = reverse('posts:post_detail', args=[self.post.id])
+        etag = self.client.get(url)['ETag']
+        response = self.reader_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_anonymous_index_has_last_modified(self):
+        last_modified = self.client.get(reverse('posts:index'))[
+            'Last-Modified'
+        ]
+        response = self.client.get(
+            reverse('posts:index'), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        response = self.reader_client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовое название',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for i in range(15):
+            post = Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {i}'
+            )
+        for i in range(5):
+            post.comments.create(author=cls.reader, text=f'Комментарий {i}')
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        cls.post = post
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_read_views_stay_within_query_budget(self):
+        """Ленты и страница поста укладываются в бюджет запросов."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.id]),
+            reverse('posts:follow_index'),
+            reverse('posts:search') + '?q=пост',
+            reverse('posts:post_comments', args=[self.post.id]),
+        )
+        for url in urls:
+            for client in (self.client, self.reader_client):
+                with self.subTest(url=url):
+                    self.assertWithinQueryBudget(client.get(url))
+
+
+@override_settings(VIEW_QUERY_WORKERS=2)
+class ParallelQueriesViewTests(TransactionTestCase):
+    """Представления с запросами в пуле потоков, как в dev и prod."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(title='Группа', slug='group')
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Пост из пула'
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+
+    def test_pages_render_with_pool(self):
+        pages = (
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        )
+        for _ in range(2):
+            for url in pages:
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    self.assertContains(response, 'Пост из пула')
+        response = self.client.get(pages[0])
+        self.assertTrue(response.context['following'])
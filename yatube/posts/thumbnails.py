@@ -0,0 +1,283 @@
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import features
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as thumbnail_defaults
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+
+from .models import Post
+
+CARD_GEOMETRY = '1000x400'
+CARD_OPTIONS = {'crop': 'center', 'upscale': True}
+# Ширины вариантов для srcset; пропорции — как у CARD_GEOMETRY.
+CARD_WIDTHS = (400, 700, 1000)
+# Ширина карточки в сетке Bootstrap: по ней браузер выбирает вариант.
+CARD_SIZES = (
+    '(min-width: 1200px) 1110px, (min-width: 992px) 930px, '
+    '(min-width: 768px) 690px, 100vw'
+)
+MIME_TYPES = {'JPEG': 'image/jpeg', 'WEBP': 'image/webp'}
+
+CardImage = namedtuple('CardImage', 'src width height srcset sources sizes')
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+
+
+class PendingThumbnailBackend(ThumbnailBackend):
+    """Бэкенд sorl, который умеет отвечать, не генерируя превью."""
+
+    def thumbnail_file(self, source, geometry_string, options):
+        """
+        Файл превью без обращения к хранилищу.
+
+        Параметры дополняются на месте так же, как в get_thumbnail, чтобы
+        имя файла совпадало с тем, что построит генерация.
+        """
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(thumbnail_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage)
+
+    def get_ready_thumbnail(self, file_, geometry_string, **options):
+        """
+        Возвращает превью из key-value хранилища sorl или None.
+
+        У cached_db читается только кеш: промах не идёт в базу из запроса,
+        а ставит generate, которая прочитает kvstore и вернёт запись
+        в кеш, если превью уже построено.
+        """
+        thumbnail = self.thumbnail_file(
+            ImageFile(file_), geometry_string, options
+        )
+        kv_cache = getattr(default.kvstore, 'cache', None)
+        if kv_cache is None:
+            return default.kvstore.get(thumbnail)
+        value = kv_cache.get(add_prefix(thumbnail.key))
+        if not isinstance(value, str):
+            # Нет в кеше или EMPTY_VALUE — отметка промаха в базе.
+            return None
+        return deserialize_image_file(value)
+
+    def get_thumbnails(self, file_, variants):
+        """
+        Строит недостающие превью набора [(геометрия, параметры)].
+
+        Исходник декодируется один раз на все варианты, JPEG — через
+        draft() сразу в наименьшем достаточном масштабе.
+        """
+        source = ImageFile(file_)
+        thumbnails = []
+        for geometry_string, options in variants:
+            options = dict(options)
+            thumbnails.append((
+                geometry_string,
+                options,
+                self.thumbnail_file(source, geometry_string, options)
+            ))
+        missing = [
+            item for item in thumbnails if not default.kvstore.get(item[2])
+        ]
+        if not missing:
+            return [thumbnail for *_, thumbnail in thumbnails]
+        source_image = default.engine.get_image(source)
+        source.set_size(default.engine.get_image_size(source_image))
+        image_info = default.engine.get_image_info(source_image)
+        sizes = [
+            tuple(map(int, geometry_string.split('x')))
+            for geometry_string, *_ in missing
+        ]
+        box = (max(size[0] for size in sizes), max(size[1] for size in sizes))
+        if default.engine.flip_dimensions(source_image):
+            box = box[::-1]
+        source_image.draft(None, box)
+        try:
+            for geometry_string, options, thumbnail in missing:
+                if not thumbnail.exists():
+                    self._create_thumbnail(
+                        source_image,
+                        geometry_string,
+                        {**options, 'image_info': image_info},
+                        thumbnail
+                    )
+                default.kvstore.get_or_set(source)
+                default.kvstore.set(thumbnail, source)
+        finally:
+            default.engine.cleanup(source_image)
+        return [thumbnail for *_, thumbnail in thumbnails]
+
+
+backend = PendingThumbnailBackend()
+
+
+def card_variants():
+    """
+    (формат, ширина, геометрия, параметры) вариантов карточки в порядке
+    генерации: JPEG для <img>, затем WebP, если Pillow умеет его писать.
+    """
+    formats = ('JPEG', 'WEBP') if features.check('webp') else ('JPEG',)
+    width, height = map(int, CARD_GEOMETRY.split('x'))
+    return [
+        (
+            image_format,
+            size,
+            f'{size}x{size * height // width}',
+            {
+                **CARD_OPTIONS,
+                'format': image_format,
+                'quality': settings.IMAGE_QUALITY,
+            },
+        )
+        for image_format in formats
+        for size in CARD_WIDTHS
+    ]
+
+
+def unprocessed(image):
+    """
+    Загрузка ещё не обработана (posts.images): у поста нет размеров.
+
+    Превью строятся по окончании обработки, поэтому до неё их заведомо
+    нет и kvstore, который на промахе читает базу, не нужен.
+    """
+    instance = getattr(image, 'instance', None)
+    return isinstance(instance, Post) and instance.image_width is None
+
+
+def card_image(image):
+    """
+    Варианты карточки для srcset или None, пока набор не построен.
+
+    Набор строится одним заданием по порядку card_variants, поэтому
+    готовность проверяется одним чтением kvstore — по последнему
+    варианту; адреса остальных вычисляются без обращения к хранилищу.
+    """
+    if unprocessed(image):
+        return None
+    variants = card_variants()
+    *_, geometry_string, options = variants[-1]
+    if backend.get_ready_thumbnail(image, geometry_string, **options) is None:
+        return None
+    source = ImageFile(image)
+    srcsets = {}
+    for image_format, size, geometry_string, options in variants:
+        thumbnail = backend.thumbnail_file(
+            source, geometry_string, dict(options)
+        )
+        srcsets.setdefault(image_format, []).append((thumbnail.url, size))
+    fallback = srcsets.pop('JPEG')
+    width, height = map(int, CARD_GEOMETRY.split('x'))
+    return CardImage(
+        src=fallback[-1][0],
+        width=width,
+        height=height,
+        srcset=_srcset(fallback),
+        sources=[
+            (MIME_TYPES[image_format], _srcset(candidates))
+            for image_format, candidates in srcsets.items()
+        ],
+        sizes=CARD_SIZES
+    )
+
+
+def _srcset(candidates):
+    return ', '.join(f'{url} {size}w' for url, size in candidates)
+
+
+def generate(name):
+    """
+    Строит превью карточки для файла; True, если всё прошло успешно.
+
+    Готовые превью меняют разметку карточек, поэтому посты с этим
+    файлом получают новую версию: меняются их ETag и ключи кеша.
+    """
+    # caching сам импортирует этот модуль.
+    from .caching import invalidate_index
+
+    try:
+        # Хранилище поля: от него зависят ключи sorl, общие с шаблонами.
+        source = ImageFile(name, Post.image.field.storage)
+        backend.get_thumbnails(source, [
+            (geometry_string, options)
+            for *_, geometry_string, options in card_variants()
+        ])
+    except Exception:
+        logger.exception('Не удалось построить превью для %s', name)
+        return False
+    if Post.objects.filter(image=name).update(updated_at=timezone.now()):
+        invalidate_index()
+    return True
+
+
+def _execute(job, name):
+    try:
+        job(name)
+    finally:
+        with _lock:
+            _pending.discard(name)
+
+
+def _run(job, name):
+    try:
+        _execute(job, name)
+    finally:
+        connections.close_all()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails'
+            )
+    return _executor
+
+
+def _submit(name, job):
+    """
+    Одна задача на файл: пока файл в работе (превью или обработка
+    загрузки), повторные заявки на него пропускаются.
+    """
+    with _lock:
+        if name in _pending:
+            return
+        _pending.add(name)
+    if settings.THUMBNAIL_WORKERS:
+        _get_executor().submit(_run, job, name)
+    else:
+        _execute(job, name)
+
+
+def schedule(image, job=generate):
+    """
+    Ставит задачу по файлу в пул; по умолчанию генерацию превью.
+
+    Вызывать после сохранения модели: до него у файла имя загрузки,
+    а не итоговое. Внутри atomic задача ждёт коммита, вне транзакции
+    on_commit запускает её сразу.
+    """
+    def submit():
+        if image:
+            _submit(image.name, job)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,175 @@
+import heapq
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection
+
+from core.concurrent import gather
+
+from .models import Follow, Post, Profile, TimelineEntry
+
+BATCH_SIZE = 500
+CELEBRITIES_KEY = 'timeline:celebrities'
+PULLED_KEY = 'timeline:pulled:{}'
+REBUILD_SQL = (
+    'INSERT INTO {timeline} (user_id, post_id, pub_date) '
+    'SELECT follow.user_id, latest.id, latest.pub_date '
+    'FROM {follow} follow, ('
+    'SELECT id, pub_date FROM {post} WHERE author_id = %s '
+    'ORDER BY pub_date DESC, id DESC LIMIT %s'
+    ') latest '
+    'WHERE follow.author_id = %s'
+)
+
+
+def celebrity_ids():
+    """
+    Авторы, у которых подписчиков больше TIMELINE_FANOUT_LIMIT.
+
+    Их посты не раскладываются по лентам при публикации, а подтягиваются
+    читателем в момент открытия ленты.
+    """
+    ids = cache.get(CELEBRITIES_KEY)
+    if ids is None:
+        ids = set(
+            Profile.objects.filter(
+                followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+            ).values_list('user_id', flat=True)
+        )
+        cache.set(
+            CELEBRITIES_KEY, ids, settings.TIMELINE_CELEBRITY_CACHE_DURATION
+        )
+    return ids
+
+
+def _add_entries(user_ids_and_posts):
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for user_id, post_id, pub_date in user_ids_and_posts
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    if post.author_id in celebrity_ids():
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    _add_entries(
+        (user_id, post.id, post.pub_date)
+        for user_id in followers.iterator()
+    )
+
+
+def _latest_posts(**filters):
+    return Post.objects.filter(**filters).order_by(
+        '-pub_date', '-id'
+    ).values_list('id', 'pub_date')[:settings.TIMELINE_BACKFILL_LIMIT]
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту свежие посты автора после подписки на него."""
+    _add_entries(
+        (user_id, post_id, pub_date)
+        for post_id, pub_date in _latest_posts(author_id=author_id)
+    )
+
+
+def prune(user_id, author_id):
+    """Убирает из ленты посты автора после отписки."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def rebuild():
+    """
+    Заново раскладывает все ленты после массовой загрузки без сигналов.
+
+    Каждый автор обрабатывается одним INSERT ... SELECT, без выборки
+    строк в Python: после bulk-загрузки записей в лентах десятки миллионов.
+    """
+    TimelineEntry.objects.all().delete()
+    cache.delete(CELEBRITIES_KEY)
+    celebrities = celebrity_ids()
+    authors = list(
+        Follow.objects.exclude(author_id__in=celebrities)
+        .order_by('author_id')
+        .values_list('author_id', flat=True)
+        .distinct()
+    )
+    sql = REBUILD_SQL.format(
+        timeline=TimelineEntry._meta.db_table,
+        follow=Follow._meta.db_table,
+        post=Post._meta.db_table
+    )
+    with connection.cursor() as cursor:
+        for author_id in authors:
+            cursor.execute(sql, [
+                author_id, settings.TIMELINE_BACKFILL_LIMIT, author_id
+            ])
+    return TimelineEntry.objects.count()
+
+
+def pull_celebrity_posts(user):
+    """
+    Подтягивает в ленту новые посты авторов без fan-out при записи.
+
+    Возвращает True, если в ленту что-то добавилось: только тогда
+    чтение ленты нужно направить в основную базу.
+    """
+    celebrities = celebrity_ids()
+    if not celebrities:
+        return False
+    authors = list(
+        Follow.objects.filter(
+            user=user, author_id__in=celebrities
+        ).values_list('author_id', flat=True)
+    )
+    if not authors:
+        return False
+    key = PULLED_KEY.format(user.id)
+    filters = {}
+    pulled = cache.get(key)
+    if pulled is not None:
+        filters['pub_date__gt'] = pulled
+    # По запросу на автора: каждый идёт по индексу (author, -pub_date),
+    # а author_id IN (...) с ORDER BY сортировал бы во временном B-дереве.
+    # Запросы независимы, поэтому выполняются параллельно.
+    posts = list(islice(
+        heapq.merge(
+            *gather(*(
+                partial(list, _latest_posts(author_id=author_id, **filters))
+                for author_id in authors
+            )),
+            key=lambda row: (row[1], row[0]),
+            reverse=True
+        ),
+        settings.TIMELINE_BACKFILL_LIMIT
+    ))
+    if not posts:
+        return False
+    cache.set(key, posts[0][1], None)
+    # Первый раз подтягиваются и посты, уже добавленные подпиской:
+    # без новых строк транзакция записи не нужна. Проверка — по основной
+    # базе, реплика может не видеть последних записей.
+    present = set(
+        TimelineEntry.objects.using(DEFAULT_DB_ALIAS).filter(
+            user=user, post_id__in=[post_id for post_id, _ in posts]
+        ).values_list('post_id', flat=True)
+    )
+    missing = [
+        (user.id, post_id, pub_date)
+        for post_id, pub_date in posts if post_id not in present
+    ]
+    if not missing:
+        return False
+    _add_entries(missing)
+    return True
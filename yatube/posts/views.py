@@ -1,55 +1,130 @@
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.db import DEFAULT_DB_ALIAS
+from django.http import (Http404, HttpResponse, HttpResponseBadRequest,
+                         JsonResponse, StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.views.decorators.http import condition
 
+from core.compression import cache_compressed
+from core.concurrent import gather
+from core.db.routers import pins_primary, replica_reads
+from core.metrics import query_budget, unbudgeted_queries
+
+from . import conditional, export
+from .caching import detach_page, index_cache_key
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import Comment, Follow, Group, Post, User
+from .pagination import CursorPaginator, get_feed_page
+from .search import MAX_QUERY_TERMS, get_backend, search_terms
+from .timeline import pull_celebrity_posts
 
 
 def paginator(posts, request):
-    paginator = Paginator(posts, settings.MAX_POSTS)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+    return get_feed_page(posts, request, settings.MAX_POSTS)
 
 
-def index(request):
-    posts = Post.objects.select_related('author', 'group')
-    return render(
-        request,
-        'posts/index.html',
-        {'page_obj': paginator(posts, request)}
+def comments_page(post_id, request):
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author'
+    ).order_by('created', 'id')
+    paginator = CursorPaginator(
+        comments, settings.MAX_COMMENTS, date_field='created', descending=False
     )
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+@replica_reads
+@query_budget(4)
+@condition(
+    etag_func=conditional.index_etag,
+    last_modified_func=conditional.index_last_modified
+)
+def index(request):
+    key = index_cache_key(request)
+    cached = cache.get(key)
+    if cached is not None and not request.user.is_authenticated:
+        return cache_compressed(
+            HttpResponse(cached), settings.HOME_PAGE_CACHE_DURATION
+        )
+    page_obj = cached
+    if page_obj is None:
+        posts = Post.objects.select_related('author', 'group')
+        page_obj = detach_page(paginator(posts, request))
+    response = render(request, 'posts/index.html', {'page_obj': page_obj})
+    if cached is None:
+        cache.set(
+            key,
+            page_obj if request.user.is_authenticated else response.content,
+            settings.HOME_PAGE_CACHE_DURATION
+        )
+    if not request.user.is_authenticated:
+        cache_compressed(response, settings.HOME_PAGE_CACHE_DURATION)
+    return response
 
 
+@replica_reads
+@query_budget(5)
+@condition(etag_func=conditional.group_etag)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('author')
+    posts = Post.objects.filter(group__slug=slug).select_related('author')
+    group, page_obj = gather(
+        lambda: get_object_or_404(Group, slug=slug),
+        lambda: paginator(posts, request)
+    )
+    for post in page_obj:
+        post.group = group
     context = {
         'group': group,
-        'page_obj': paginator(posts, request)
+        'page_obj': page_obj
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@replica_reads
+@query_budget(7)
+@condition(etag_func=conditional.profile_etag)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('group')
+    user_id = request.user.id
+    posts = Post.objects.filter(
+        author__username=username
+    ).select_related('group')
+    author, page_obj, following = gather(
+        lambda: get_object_or_404(
+            User.objects.select_related('profile'),
+            username=username
+        ),
+        lambda: paginator(posts, request),
+        lambda: Follow.objects.filter(
+            author__username=username, user_id=user_id
+        ).exists()
+    )
+    for post in page_obj:
+        post.author = author
     context = {
         'author': author,
-        'page_obj': paginator(posts, request),
-        'following': author.following.filter(user_id=request.user.id)
+        'page_obj': page_obj,
+        'following': following
     }
     return render(request, 'posts/profile.html', context)
 
 
+@replica_reads
+@query_budget(5)
+@condition(etag_func=conditional.post_etag)
 def post_detail(request, post_id):
-    post = get_object_or_404(
-        Post.objects.select_related('author', 'group'),
-        id=post_id
+    post, comments = gather(
+        lambda: get_object_or_404(
+            Post.objects.select_related('author__profile', 'group'),
+            id=post_id
+        ),
+        lambda: comments_page(post_id, request)
     )
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
     context = {
         'post': post,
         'form': form,
@@ -58,6 +133,52 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+@replica_reads
+@query_budget(2)
+def post_comments(request, post_id):
+    exists, comments = gather(
+        lambda: Post.objects.filter(id=post_id).exists(),
+        lambda: comments_page(post_id, request)
+    )
+    if not exists:
+        raise Http404
+    next_cursor = comments.paginator.next_cursor
+    return JsonResponse({
+        'html': render_to_string(
+            'posts/comment_list.html', {'comments': comments}, request
+        ),
+        'next': next_cursor and (
+            reverse('posts:post_comments', args=[post_id])
+            + f'?cursor={next_cursor}'
+        ),
+    })
+
+
+@replica_reads
+@query_budget(6)
+def search(request):
+    query = request.GET.get('q', '').strip()
+    terms = search_terms(query, MAX_QUERY_TERMS)
+    context = {'query': query}
+    if terms:
+        backend = get_backend()
+        page_obj = Paginator(
+            backend.search_posts(terms), settings.MAX_POSTS
+        ).get_page(request.GET.get('page'))
+        post_ids = list(page_obj.object_list)
+        posts = Post.objects.select_related('author', 'group').in_bulk(
+            post_ids
+        )
+        page_obj.object_list = [posts[pk] for pk in post_ids if pk in posts]
+        group_ids = backend.search_groups(terms, settings.SEARCH_GROUPS)
+        groups = Group.objects.in_bulk(group_ids)
+        context.update({
+            'page_obj': page_obj,
+            'groups': [groups[pk] for pk in group_ids if pk in groups],
+        })
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
@@ -67,6 +188,7 @@ def post_create(request):
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    form.save_m2m()
     return redirect('posts:profile', username=post.author)
 
 
@@ -89,6 +211,7 @@ def post_edit(request, post_id):
     return redirect('posts:post_detail', post_id)
 
 
+@pins_primary
 def post_delete(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     post.delete()
@@ -108,18 +231,25 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@replica_reads
+@query_budget(4)
 @login_required
 def follow_index(request):
-    posts = Post.objects.select_related('group').filter(
-        author__following__user=request.user
-    )
-    return render(
-        request,
-        'posts/follow.html',
-        {'page_obj': paginator(posts, request)}
+    entries = request.user.timeline.select_related(
+        'post__author', 'post__group'
     )
+    # Запросов у подтягивания — по одному на автора: вне бюджета.
+    with unbudgeted_queries():
+        pulled = pull_celebrity_posts(request.user)
+    if pulled:
+        # Только что подтянутых записей на реплике ещё нет.
+        entries = entries.using(DEFAULT_DB_ALIAS)
+    page_obj = paginator(entries, request)
+    page_obj.object_list = [entry.post for entry in page_obj]
+    return render(request, 'posts/follow.html', {'page_obj': page_obj})
 
 
+@pins_primary
 @login_required
 def profile_follow(request, username):
     author = User.objects.get(username=username)
@@ -128,6 +258,7 @@ def profile_follow(request, username):
     return redirect('posts:profile', username=username)
 
 
+@pins_primary
 @login_required
 def profile_unfollow(request, username):
     Follow.objects.filter(
@@ -135,3 +266,32 @@ def profile_unfollow(request, username):
         author__username=username
     ).delete()
     return redirect('posts:profile', username=username)
+
+
+@login_required
+def data_export(request):
+    """
+    Выгрузка своих данных: ?format=ndjson|csv, ?kind= — одна таблица.
+
+    Ответ потоковый: строки читаются из базы по мере отдачи клиенту.
+    """
+    export_format = request.GET.get('format', 'ndjson')
+    kind = request.GET.get('kind')
+    if export_format not in export.FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат')
+    if kind is not None and kind not in export.USER_FIELDS:
+        return HttpResponseBadRequest('Неизвестная таблица')
+    if export_format == 'csv' and kind is None:
+        return HttpResponseBadRequest('Для CSV укажите kind')
+    content_type, extension = export.FORMATS[export_format]
+    response = StreamingHttpResponse(
+        export.stream(
+            export.user_tables(request.user, kind and [kind]), export_format
+        ),
+        content_type=f'{content_type}; charset=utf-8'
+    )
+    name = '-'.join(filter(None, ('yatube', request.user.username, kind)))
+    response['Content-Disposition'] = (
+        f'attachment; filename="{name}.{extension}"'
+    )
+    return response
@@ -0,0 +1,24 @@
+"""
+Профиль настроек выбирается переменной YATUBE_ENV: dev (по умолчанию),
+test или prod. Без переменной `manage.py test` и pytest получают test.
+Базу и кеш любого профиля можно переопределить через YATUBE_DB_*
+и YATUBE_CACHE* (см. environment.py).
+"""
+import sys
+
+from .environment import env
+
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
+PROFILE = env('ENV', 'test' if TESTING else 'dev')
+
+if PROFILE == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif PROFILE == 'test':
+    from .test import *  # noqa: F401,F403
+elif PROFILE == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    from django.core.exceptions import ImproperlyConfigured
+
+    raise ImproperlyConfigured(f'Неизвестный YATUBE_ENV: {PROFILE}')
@@ -1,20 +1,47 @@
 import os
 
+from .environment import cache, databases, env, env_list
+
 MAX_POSTS = 10
+MAX_COMMENTS = 20
+SEARCH_GROUPS = 5
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_BACKFILL_LIMIT = 1000
+TIMELINE_CELEBRITY_CACHE_DURATION = 300
 HOME_PAGE_CACHE_DURATION = 20
+POST_CARD_CACHE_DURATION = 60 * 60 * 24
+THUMBNAIL_WORKERS = 2
+# Потоки для независимых запросов одного представления (core.concurrent).
+VIEW_QUERY_WORKERS = 4
+METRICS_BUFFER_SIZE = 10000
+# Обработка загруженных изображений (posts.images).
+IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+IMAGE_MAX_SIZE = (2048, 2048)
+IMAGE_FORMAT = 'WEBP'
+IMAGE_QUALITY = 80
+# Строк на один fetch и на один кусок потоковой выгрузки.
+EXPORT_CHUNK_SIZE = 2000
+
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+SECRET_KEY = env(
+    'SECRET_KEY', 't&hrapj5sr5!i-$l-!qt)9n4*74gc4b^uds-ryui&&ri@&c#+0'
+)
+
+DEBUG = False
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-SECRET_KEY = 't&hrapj5sr5!i-$l-!qt)9n4*74gc4b^uds-ryui&&ri@&c#+0'
-
-DEBUG = True
-
-ALLOWED_HOSTS = [
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', [
     'localhost',
     '127.0.0.1',
     '[::1]',
     'testserver',
-]
+])
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -27,10 +54,15 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    # До всего, что читает или меняет тело ответа.
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -45,7 +77,7 @@ ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.InstrumentedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -60,15 +92,20 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать все шаблоны при старте WSGI-процесса (см. yatube/wsgi.py).
+WARM_TEMPLATES = False
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
-}
+DATABASES = databases(BASE_DIR)
+
+# Реплики только для чтения; см. core/db/routers.py.
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+
+# Сколько секунд после записи читать с default, пока реплика догоняет.
+REPLICA_PIN_SECONDS = 15
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -101,6 +138,9 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = env('STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+# Отдавать STATIC_ROOT из WSGI-процесса (core.static), без nginx.
+SERVE_STATIC = False
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -110,10 +150,12 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 MEDIA_URL = '/yatube/media/'
+# Загрузки пишутся во временный файл кусками, а не держатся в памяти.
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
-#     }
-# }
+CACHES = {
+    'default': cache(BASE_DIR),
+}
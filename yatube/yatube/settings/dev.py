@@ -0,0 +1,4 @@
+from .base import *  # noqa: F401,F403
+from .environment import env_bool
+
+DEBUG = env_bool('DEBUG', True)
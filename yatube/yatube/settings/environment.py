@@ -0,0 +1,104 @@
+"""
+Чтение настроек из переменных окружения YATUBE_*.
+
+Профиль, база и кеш выбираются при импорте настроек, так что одну и ту же
+сборку можно гонять на SQLite, PostgreSQL и разных кешах без правки кода.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'redis': 'django_redis.cache.RedisCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+DEFAULT_CACHE_LOCATIONS = {
+    'memcached': '127.0.0.1:11211',
+    'redis': 'redis://127.0.0.1:6379/1',
+}
+
+
+def env(name, default=None):
+    return os.environ.get(f'YATUBE_{name}', default)
+
+
+def env_bool(name, default=False):
+    value = env(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_int(name, default):
+    return int(env(name, default))
+
+
+def env_list(name, default):
+    value = env(name)
+    return value.split(',') if value else default
+
+
+def database(base_dir, conn_max_age=0):
+    """
+    YATUBE_DB_ENGINE=sqlite|postgresql и параметры подключения.
+
+    CONN_MAX_AGE держит соединение открытым между запросами; для
+    PostgreSQL это экономит установку соединения на каждый запрос.
+    """
+    engine = env('DB_ENGINE', 'sqlite')
+    if engine == 'sqlite':
+        return {
+            'ENGINE': 'core.db.backends.sqlite3',
+            'NAME': env('DB_NAME', os.path.join(base_dir, 'db.sqlite3')),
+        }
+    if engine == 'postgresql':
+        return {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': env('DB_NAME', 'yatube'),
+            'USER': env('DB_USER', 'yatube'),
+            'PASSWORD': env('DB_PASSWORD', ''),
+            'HOST': env('DB_HOST', 'localhost'),
+            'PORT': env('DB_PORT', '5432'),
+            'CONN_MAX_AGE': env_int('DB_CONN_MAX_AGE', conn_max_age),
+        }
+    raise ImproperlyConfigured(f'Неизвестный YATUBE_DB_ENGINE: {engine}')
+
+
+def databases(base_dir, conn_max_age=0):
+    """
+    default и реплики replica1, replica2... из YATUBE_DB_REPLICAS.
+
+    Для PostgreSQL в списке хосты реплик, для SQLite — пути к копиям файла.
+    В тестах реплики смотрят в тестовую default (MIRROR).
+    """
+    primary = database(base_dir, conn_max_age)
+    key = 'NAME' if primary['ENGINE'] == 'core.db.backends.sqlite3' else 'HOST'
+    result = {'default': primary}
+    for number, value in enumerate(env_list('DB_REPLICAS', []), start=1):
+        result[f'replica{number}'] = {
+            **primary,
+            key: value,
+            'TEST': {'MIRROR': 'default'},
+        }
+    return result
+
+
+def cache(base_dir, default_backend='locmem'):
+    """
+    YATUBE_CACHE=locmem|file|memcached|redis|dummy
+    и YATUBE_CACHE_LOCATION.
+    """
+    backend = env('CACHE', default_backend)
+    if backend not in CACHE_BACKENDS:
+        raise ImproperlyConfigured(f'Неизвестный YATUBE_CACHE: {backend}')
+    locations = {
+        **DEFAULT_CACHE_LOCATIONS,
+        'file': os.path.join(base_dir, 'cache'),
+    }
+    return {
+        'BACKEND': CACHE_BACKENDS[backend],
+        'LOCATION': env('CACHE_LOCATION', locations.get(backend, '')),
+    }
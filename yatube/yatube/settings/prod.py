@@ -0,0 +1,42 @@
+"""
+Боевой профиль: DEBUG выключен, шаблоны компилируются один раз,
+соединения с базой живут между запросами, кеш общий для процессов.
+
+    YATUBE_ENV=prod python manage.py collectstatic --noinput
+    YATUBE_ENV=prod YATUBE_SECRET_KEY=... YATUBE_DB_ENGINE=postgresql \
+        gunicorn yatube.wsgi
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, TEMPLATES
+from .environment import cache, databases, env, env_bool
+
+SECRET_KEY = env('SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Для профиля prod задайте YATUBE_SECRET_KEY')
+
+DATABASES = databases(BASE_DIR, conn_max_age=60)
+
+# Кеш в памяти процесса не виден другим воркерам: сброс поколения
+# главной ленты в одном не дошёл бы до остальных.
+CACHES = {
+    'default': cache(BASE_DIR, default_backend='file'),
+}
+
+# Имена с хешем содержимого и сжатые копии; нужен collectstatic.
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+SERVE_STATIC = env_bool('SERVE_STATIC', True)
+
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    (
+        'django.template.loaders.cached.Loader',
+        [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ],
+    ),
+]
+
+WARM_TEMPLATES = True
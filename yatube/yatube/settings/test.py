@@ -0,0 +1,10 @@
+from .base import *  # noqa: F401,F403
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Превью и запросы представлений выполняются в том же потоке, чтобы
+# тесты видели результат сразу.
+THUMBNAIL_WORKERS = 0
+VIEW_QUERY_WORKERS = 0
@@ -1,7 +1,20 @@
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if settings.SERVE_STATIC:
+    from core.static import StaticFilesApplication
+
+    application = StaticFilesApplication(
+        application, settings.STATIC_ROOT, settings.STATIC_URL
+    )
+
+if settings.WARM_TEMPLATES:
+    from core.template_backends import warm_templates
+
+    warm_templates()